@@ -0,0 +1,560 @@
+"""
+Micro-benchmarks for the HUD pipeline, run against a fake Pixoo device so no
+hardware is needed:
+
+    python benchmark.py
+"""
+
+import os
+import logging
+import tempfile
+import threading
+import time
+import tracemalloc
+import zmq
+from unittest import mock
+from json import dumps
+from typing import Any, Callable, Dict, List, Set, Tuple
+from PIL import Image, ImageDraw, ImageEnhance
+from pixoo_client import PixooClient, FrameEncoder
+from color_calibration import ColorCalibration
+from hud_animations import flash_frames
+from dota_game_states import state_fields, state_signature
+from pixoo_sub import HUDSubscriber
+from hud_renderer import HUDRenderer
+from scoreboard_renderer import ScoreboardRenderer
+from dota_2_cdn import HEROTHUMB_CACHE, ABILITYICON_CACHE
+from cooldown_overlay import get_sweep_masks, quantize_fraction, shade_cooldown
+from gsi_codec import GSICodec, train_dictionary, wire_topic, zstandard
+from pixoo_emulator import EmulatedPixoo, start_emulator
+from config import (
+    ZMQ_HUD_TOPIC,
+    ZMQ_STATE_TOPIC,
+    ZMQ_STATE_HEARTBEAT,
+    TARGET_FPS,
+    SCOREBOARD_FRAME_BUDGET,
+)
+
+# Python heap a steady-state HUD frame may use at its peak (text rendering
+# internals and number strings; 1.8-2 KB depending on what ran before). Stray
+# images and draw contexts are counted separately, since one adds only a few
+# hundred bytes of Python heap.
+RENDER_ALLOCATION_BUDGET = 3072
+
+
+class FakeResponse:
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Dict[str, Any]:
+        return self.payload
+
+
+class FakePixooSession:
+    """
+    Stand-in for `requests.Session` that counts round trips to the device and
+    simulates the panel's slow HTTP handling with a fixed latency.
+    """
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.requests: List[Dict[str, Any]] = []
+        self.bytes_sent = 0
+
+    def post(self, url: str, json: Dict[str, Any] = None, data: bytes = None, **kwargs):
+        body = data if data is not None else dumps(json).encode()
+        self.requests.append(json if json is not None else {})
+        self.bytes_sent += len(body)
+        time.sleep(self.latency)
+        return FakeResponse({"error_code": 0, "SelectIndex": 0})
+
+
+def make_frame(i: int) -> Image.Image:
+    """
+    A HUD-like frame: a busy static background with an HP bar and gold counter
+    that change every update.
+    """
+    img = Image.effect_noise((64, 64), 64).convert("RGBA")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 26, i % 40, 30], fill=(0, 255, 0))
+    draw.text((44, 40), str(600 + i * 7), fill=(245, 200, 0))
+    return img
+
+
+def bench_animation_uploads(frame_count: int = 4, speed: int = 100, runs: int = 5) -> None:
+    frames = flash_frames(make_frame(30), (255, 215, 0), steps=frame_count - 1)
+    animation_seconds = frame_count * speed / 1000
+
+    for label, push in [
+        ("per-frame push", lambda c: [c.push_frame(f) for f in frames]),
+        ("batched upload", lambda c: c.push_animation(frames, speed)),
+    ]:
+        session = FakePixooSession()
+        client = PixooClient("fake", session=session)
+        client.frame_ids.counter = 0  # skip the startup reset
+        start = time.perf_counter()
+        for _ in range(runs):
+            push(client)
+        elapsed = (time.perf_counter() - start) / runs
+        # Don't let the final still fire during the benchmarks that follow
+        timer = client.still_timer
+        client.cancel_still()
+        if timer is not None:
+            timer.join()
+        round_trips = len(session.requests) / runs
+        print(
+            f"{label:>16}: {round_trips:.0f} round trips/animation, "
+            f"{round_trips / animation_seconds:.1f} round trips per animation second, "
+            f"{elapsed * 1000:.1f} ms upload"
+        )
+
+
+def bench_payload_encoding(pushes: int = 500) -> None:
+    background = make_frame(0)
+    frames = []
+    for i in range(pushes):
+        frame = background.copy()
+        draw = ImageDraw.Draw(frame)
+        draw.rectangle([0, 26, 40, 30], fill=(50, 50, 50))
+        draw.rectangle([0, 26, i % 40, 30], fill=(0, 255, 0))
+        draw.text((44, 40), str(600 + i * 7), fill=(245, 200, 0))
+        frames.append(frame)
+    client = PixooClient("fake", session=FakePixooSession(latency=0))
+
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        dumps(client.frame_command(i, client.encode_frame(frame))).encode()
+    full = (time.perf_counter() - start) / pushes
+
+    encoder = FrameEncoder()
+    rows = 0
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        rows += encoder.update(frame)
+        encoder.frame_body(i)
+    incremental = (time.perf_counter() - start) / pushes
+    assert encoder.pic_data() == client.encode_frame(frames[-1])
+
+    print(f"  full re-encode: {full * 1e6:.0f} us/push")
+    print(
+        f"     incremental: {incremental * 1e6:.0f} us/push "
+        f"({incremental / full:.0%}, {rows / pushes:.1f} of 64 rows re-encoded)"
+    )
+
+
+def bench_color_calibration(frames: int = 2000) -> None:
+    frame = make_frame(3)
+    calibration = ColorCalibration(brightness=1.2, gamma=1.1, white_balance=(1.0, 0.95, 0.9))
+
+    # The same correction as separate passes: brightness, gamma, white balance
+    gamma_lut = [round(255 * (v / 255) ** (1 / 1.1)) for v in range(256)]
+    start = time.perf_counter()
+    for _ in range(frames):
+        img = ImageEnhance.Brightness(frame).enhance(1.2).point(gamma_lut * 4)
+        r, g, b, a = img.split()
+        Image.merge("RGBA", (r, g.point(lambda v: v * 0.95), b.point(lambda v: v * 0.9), a))
+    enhance = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        calibration.apply(frame)
+    lut = (time.perf_counter() - start) / frames
+
+    print(f"   separate passes: {enhance * 1e6:.0f} us/frame")
+    print(f"  one lookup table: {lut * 1e6:.0f} us/frame ({lut / enhance:.0%})")
+
+
+def make_abilities() -> Dict[str, Dict[str, Any]]:
+    """Four learned abilities plus a talent, with icons seeded so nothing is downloaded."""
+    abilities = {}
+    for i in range(4):
+        ABILITYICON_CACHE[f"bench_ability{i}"] = make_frame(i).resize((6, 6))
+        abilities[f"ability{i}"] = {"name": f"bench_ability{i}", "level": 1, "cooldown": 0}
+    abilities["ability4"] = {"name": "special_bonus_bench", "level": 0, "cooldown": 0}
+    return abilities
+
+
+def bench_cooldown_overlay(frames: int = 500, steps: int = 16) -> None:
+    """
+    Shading ten icons (six items, four abilities) with cooldowns running, by
+    drawing each sweep as a pie slice per frame vs blitting precomputed masks.
+    """
+    canvas = Image.new("RGB", (64, 64))
+    icons = [((2 + 13 * (i % 3), 39 + 13 * (i // 3)), (12, 12)) for i in range(6)]
+    icons += [((7 * i, 19), (6, 6)) for i in range(4)]
+    fractions = [(i * 0.07 + f / frames) % 1 for f in range(frames) for i in range(10)]
+
+    start = time.perf_counter()
+    for n, fraction in enumerate(fractions):
+        (x, y), (w, h) = icons[n % 10]
+        mask = Image.new("L", (w, h), 0)
+        ImageDraw.Draw(mask).pieslice(
+            [-w / 2, -h / 2, w * 1.5, h * 1.5], -90 + 360 * (1 - fraction), 270, fill=170
+        )
+        canvas.paste((0, 0, 0), (x, y, x + w, y + h), mask)
+    drawn = (time.perf_counter() - start) / frames
+
+    masks = {size: get_sweep_masks(size, steps) for size in [(12, 12), (6, 6)]}
+    start = time.perf_counter()
+    for n, fraction in enumerate(fractions):
+        position, size = icons[n % 10]
+        step = quantize_fraction(fraction, steps)
+        if step:
+            shade_cooldown(canvas, position, size, masks[size][step])
+    blitted = (time.perf_counter() - start) / frames
+
+    print(f"  pie slice per frame: {drawn * 1e6:.0f} us/frame")
+    print(f"   precomputed masks: {blitted * 1e6:.0f} us/frame ({blitted / drawn:.0%})")
+
+
+def measure_render_allocations(frames: int = 200) -> Tuple[int, int]:
+    """
+    Peak Python heap in bytes used by the worst steady-state HUD frame (same
+    hero, items and abilities, changing bars and numbers), and the number of
+    images and draw contexts created over all frames. Pixel buffers live in
+    Pillow's C allocator, which tracemalloc cannot see, hence the count.
+
+    tracemalloc traces every thread, so this refuses to run alongside others.
+    """
+    current = threading.current_thread()
+    others = [t.name for t in threading.enumerate() if t is not current]
+    if others:
+        raise RuntimeError(f"Other threads would skew the allocation count: {others}")
+
+    renderer = HUDRenderer(cooldown_overlay=True)
+    items = {f"slot{i}": {"name": "empty"} for i in range(6)}
+    abilities = make_abilities()
+
+    def render(i: int) -> Image.Image:
+        return renderer.create_base_layout(
+            "npc_dota_hero_unknown", 5, (i % 40) / 40, 0.5, items, 3, i % 12, 7, 600 + i,
+            abilities=abilities,
+        )
+
+    # Warm the static layer, inventory grid, level label and both buffers
+    for i in range(4):
+        render(i)
+
+    created = 0
+
+    def counted(init: Callable) -> Callable:
+        def wrapper(self, *args, **kwargs):
+            nonlocal created
+            created += 1
+            init(self, *args, **kwargs)
+
+        return wrapper
+
+    worst = 0
+    with mock.patch.object(Image.Image, "__init__", counted(Image.Image.__init__)):
+        with mock.patch.object(
+            ImageDraw.ImageDraw, "__init__", counted(ImageDraw.ImageDraw.__init__)
+        ):
+            tracemalloc.start()
+            try:
+                for i in range(frames):
+                    tracemalloc.reset_peak()
+                    baseline = tracemalloc.get_traced_memory()[0]
+                    render(i)
+                    worst = max(worst, tracemalloc.get_traced_memory()[1] - baseline)
+            finally:
+                tracemalloc.stop()
+    return worst, created
+
+
+def bench_render_allocations() -> None:
+    worst, created = measure_render_allocations()
+    print(
+        f"  peak per frame: {worst} B of Python heap "
+        f"(budget {RENDER_ALLOCATION_BUDGET} B), {created} images/draw contexts "
+        f"created; both enforced by test_render_allocations.py"
+    )
+
+
+def make_spectator_match(updates: int = 300) -> List[Dict[str, Any]]:
+    """
+    Synthetic spectator payloads: one player's net worth ticks up per update,
+    and every 30 updates a Radiant player kills a Dire player who stays dead
+    for 5 updates.
+    """
+    stats = [{"kills": 0, "deaths": 0, "assists": 0, "net_worth": 600} for _ in range(10)]
+    dead_until = [0] * 10
+    payloads = []
+    for t in range(updates):
+        stats[t % 10]["net_worth"] += 37 * t % 200
+        if t % 30 == 0:
+            killer, victim = (t // 30) % 5, 5 + (t // 30) % 5
+            stats[killer]["kills"] += 1
+            stats[victim]["deaths"] += 1
+            dead_until[victim] = t + 5
+
+        def team(first: int, key: str) -> Dict[str, Dict[str, Any]]:
+            return {
+                f"player{i}": (
+                    dict(stats[i])
+                    if key == "player"
+                    else {"name": f"npc_dota_hero_bench{i}", "alive": t >= dead_until[i]}
+                )
+                for i in range(first, first + 5)
+            }
+
+        payloads.append(
+            {
+                "map": {"game_state": "DOTA_GAMERULES_STATE_GAME_IN_PROGRESS", "paused": False},
+                "player": {"team2": team(0, "player"), "team3": team(5, "player")},
+                "hero": {"team2": team(0, "hero"), "team3": team(5, "hero")},
+            }
+        )
+    return payloads
+
+
+def bench_scoreboard(updates: int = 300) -> None:
+    payloads = make_spectator_match(updates)
+    budget = SCOREBOARD_FRAME_BUDGET / TARGET_FPS
+
+    for label, full_redraw in [("every row", True), ("changed rows", False)]:
+        renderer = ScoreboardRenderer(budget=budget)
+        # Portraits come warm from the cache snapshot, so no downloads are timed
+        for i in range(10):
+            HEROTHUMB_CACHE[(f"bench{i}", renderer.portrait_size)] = make_frame(i).resize(
+                renderer.portrait_size
+            )
+        client = PixooClient("fake", session=FakePixooSession(latency=0))
+        rows_drawn, rows_encoded, worst = 0, 0, 0.0
+
+        start = time.perf_counter()
+        for data in payloads:
+            frame_start = time.perf_counter()
+            if full_redraw:
+                renderer.drawn = [None] * len(renderer.drawn)
+            img, dirty_rows = renderer.render(data)
+            rows_drawn += 64 if dirty_rows is None else len(dirty_rows)
+            if dirty_rows != []:
+                rows_encoded += client.encoder.update(img, dirty_rows)
+            worst = max(worst, time.perf_counter() - frame_start)
+        elapsed = (time.perf_counter() - start) / updates
+
+        print(
+            f"  {label:>12}: {elapsed * 1000:.2f} ms/frame (worst {worst * 1000:.2f} ms, "
+            f"budget {budget * 1000:.0f} ms), {rows_drawn / updates:.1f} pixel rows drawn, "
+            f"{rows_encoded / updates:.1f} re-encoded"
+        )
+
+
+def make_match() -> List[Dict[str, Any]]:
+    """
+    A synthetic one-update-per-second match: hero selection, pre-game, a game
+    with periodic deaths and one pause, then post-game.
+    """
+    updates = []
+
+    def update(game_state: str, t: int, alive: bool = True, paused: bool = False):
+        updates.append(
+            {
+                "provider": {"name": "Dota 2", "appid": 570, "timestamp": t},
+                "map": {
+                    "game_state": f"DOTA_GAMERULES_STATE_{game_state}",
+                    "clock_time": t,
+                    "paused": paused,
+                },
+                "player": {"kills": t // 120, "deaths": t // 100, "assists": t // 60, "gold": 600 + t % 900},
+                "hero": {
+                    "name": "npc_dota_hero_unknown",
+                    "level": min(30, 1 + t // 60),
+                    "alive": alive,
+                    "health": 0 if not alive else 1000 - (t % 100) * 9,
+                    "max_health": 1000,
+                    "mana": (t * 13) % 500,
+                    "max_mana": 500,
+                },
+                "items": {f"slot{i}": {"name": "empty"} for i in range(9)},
+            }
+        )
+
+    for t in range(60):
+        update("HERO_SELECTION", t)
+    for t in range(30):
+        update("PRE_GAME", t)
+    for t in range(600):
+        update("GAME_IN_PROGRESS", t, alive=t % 100 >= 25, paused=300 <= t < 340)
+    for t in range(60):
+        update("POST_GAME", t)
+    return updates
+
+
+def publish_match(
+    updates: List[Dict[str, Any]], codec: GSICodec
+) -> List[List[bytes]]:
+    """
+    The [wire topic, header, body] messages gsi_pub.py would publish for these
+    updates in the given codec.
+    """
+    messages = []
+
+    def publish(topic: str, data: Dict[str, Any]) -> None:
+        body = codec.encode(dumps(data, separators=(",", ":")).encode())
+        messages.append([wire_topic(topic, codec.name).encode(), codec.header, body])
+
+    last_signature, last_time = None, -ZMQ_STATE_HEARTBEAT
+    for t, data in enumerate(updates):
+        signature = state_signature(data)
+        if signature != last_signature or t - last_time >= ZMQ_STATE_HEARTBEAT:
+            publish(ZMQ_STATE_TOPIC, state_fields(data))
+            last_signature, last_time = signature, t
+        publish(ZMQ_HUD_TOPIC, data)
+    return messages
+
+
+class FakeSubSocket:
+    """
+    Records subscriptions so a replay only delivers what a SUB socket would.
+    """
+
+    def __init__(self):
+        self.subscriptions: Set[str] = set()
+        self.RCVTIMEO = -1
+
+    def setsockopt_string(self, option: int, topic: str) -> None:
+        if option == zmq.SUBSCRIBE:
+            self.subscriptions.add(topic)
+        else:
+            self.subscriptions.discard(topic)
+
+
+class FakeChannelSwitcher:
+    def __init__(self):
+        self.requests: List[int] = []
+
+    def request(self, channel_index: int) -> None:
+        self.requests.append(channel_index)
+
+
+def bench_idle_replay() -> None:
+    codec = GSICodec("json")
+    messages = publish_match(make_match(), codec)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    # The first pass warms the shared icon caches and is not reported
+    for label, low_power_idle in [
+        (None, False),
+        ("always awake", False),
+        ("low-power idle", True),
+    ]:
+        session = FakePixooSession(latency=0)
+        socket = FakeSubSocket()
+        subscriber = HUDSubscriber(
+            socket,
+            PixooClient("fake", session=session),
+            FakeChannelSwitcher(),
+            original_channel=1,
+            low_power_idle=low_power_idle,
+            codec=codec,
+        )
+        # Replay at one update per second of simulated time
+        clock = [0.0]
+        subscriber.state_machine.clock = lambda: clock[0]
+        wakeups = 0
+        start = time.process_time()
+        for frames in messages:
+            wire = frames[0].decode()
+            clock[0] += wire.startswith(ZMQ_HUD_TOPIC)
+            if any(wire.startswith(sub) for sub in socket.subscriptions):
+                wakeups += 1
+                subscriber.handle_message(*codec.decode_message(frames))
+        cpu = time.process_time() - start
+        if label is None:
+            continue
+        print(
+            f"{label:>16}: {wakeups} wakeups, {cpu * 1000:.0f} ms CPU, "
+            f"{len(session.requests)} device requests, "
+            f"{session.bytes_sent / 1024:.0f} KiB to device"
+        )
+
+
+def bench_wire_compression() -> None:
+    if zstandard is None:
+        print("  skipped: the zstandard package is not installed")
+        return
+    bodies = [dumps(data, separators=(",", ":")).encode() for data in make_match()]
+    # Train on half of the match, measure on the other half
+    dictionary_path = os.path.join(tempfile.mkdtemp(), "gsi.zdict")
+    train_dictionary(bodies[::2], dictionary_path, size=8192)
+    samples = bodies[1::2]
+
+    plain = zstandard.ZstdCompressor(level=3)
+    plain_decompressor = zstandard.ZstdDecompressor()
+    codec = GSICodec("zstd", dictionary_path)
+    for label, compress, decompress in [
+        ("json", lambda b: b, lambda b: b),
+        ("zstd", plain.compress, plain_decompressor.decompress),
+        ("zstd+dictionary", codec.encode, lambda b: codec.decode(codec.header, b)),
+    ]:
+        start = time.process_time()
+        encoded = [compress(body) for body in samples]
+        compress_time = time.process_time() - start
+        start = time.process_time()
+        for body in encoded:
+            decompress(body)
+        decompress_time = time.process_time() - start
+        print(
+            f"{label:>16}: {sum(map(len, encoded)) / len(samples):.0f} B/message on the wire, "
+            f"{compress_time / len(samples) * 1e6:.1f} us compress, "
+            f"{decompress_time / len(samples) * 1e6:.1f} us decompress"
+        )
+
+
+def bench_emulated_panels(
+    panels: int = 4, seconds: float = 2.0, latency: float = 0.02
+) -> None:
+    """
+    Push frames over real HTTP to emulated panels, one client thread per panel.
+    """
+    devices, clients = [], []
+    for i in range(panels):
+        device = EmulatedPixoo(f"pixoo{i}", latency=latency, jitter=latency / 2)
+        server = start_emulator("127.0.0.1", 0, device)
+        devices.append(device)
+        clients.append(PixooClient(f"127.0.0.1:{server.server_address[1]}"))
+    frames = [make_frame(i) for i in range(40)]
+
+    def push_frames(client: PixooClient) -> None:
+        deadline = time.monotonic() + seconds
+        i = 0
+        while time.monotonic() < deadline:
+            client.push_frame(frames[i % len(frames)])
+            i += 1
+
+    threads = [threading.Thread(target=push_frames, args=(c,)) for c in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    accepted = sum(device.accepted_frames for device in devices)
+    print(
+        f"{panels:>3} panels: {accepted / seconds:.1f} accepted frames/s total, "
+        f"{accepted / seconds / panels:.1f} per panel at {latency * 1000:.0f} ms latency"
+    )
+
+
+if __name__ == "__main__":
+    print("Animation uploads:")
+    bench_animation_uploads()
+    print("Frame payload encoding:")
+    bench_payload_encoding()
+    print("Steady-state render allocations:")
+    bench_render_allocations()
+    print("Cooldown overlay (10 icons):")
+    bench_cooldown_overlay()
+    print("Spectator scoreboard (10 players):")
+    bench_scoreboard()
+    print("Panel color calibration:")
+    bench_color_calibration()
+    print("Wire compression (GSI payloads):")
+    bench_wire_compression()
+    print("Emulated panels over HTTP:")
+    bench_emulated_panels()
+    print("Replayed match (750 updates):")
+    bench_idle_replay()
@@ -0,0 +1,102 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from PIL import Image
+
+
+class ColorCalibration:
+    """
+    Per-panel color correction applied to the final frame.
+
+    Brightness, gamma and white balance are folded into one precomputed
+    per-channel lookup table, so calibrating a frame is a single `Image.point`
+    pass over the whole 64x64 image. Icon caches are never touched, so a panel
+    can be retuned at runtime for free.
+    """
+
+    def __init__(
+        self,
+        brightness: float = 1.0,
+        gamma: float = 1.0,
+        white_balance: Tuple[float, float, float] = (1.0, 1.0, 1.0),
+    ):
+        self.brightness = brightness
+        self.gamma = gamma
+        self.white_balance = tuple(white_balance)
+        self.is_identity = (brightness, gamma, self.white_balance) == (
+            1.0,
+            1.0,
+            (1.0, 1.0, 1.0),
+        )
+        self.lut = self.build_lut()
+        # RGBA frames get an identity table for the alpha channel
+        self.lut_rgba = self.lut + list(range(256))
+
+    def build_lut(self) -> List[int]:
+        """
+        256 entries per channel: out = 255 * (in / 255) ** (1 / gamma) * brightness * wb.
+        Gamma above 1 lifts dark tones, which helps panels viewed in bright rooms.
+        """
+        lut = []
+        for channel_gain in self.white_balance:
+            gain = self.brightness * channel_gain
+            lut += [
+                min(255, round(255 * (v / 255) ** (1 / self.gamma) * gain))
+                for v in range(256)
+            ]
+        return lut
+
+    def apply(self, img: Image.Image) -> Image.Image:
+        if self.is_identity:
+            return img
+        if img.mode == "RGBA":
+            return img.point(self.lut_rgba)
+        return img.convert("RGB").point(self.lut)
+
+
+class CalibrationFile:
+    """
+    Calibrations per device IP loaded from a JSON file, e.g.
+        {"192.168.68.65": {"brightness": 1.2, "gamma": 1.1, "white_balance": [1, 0.95, 0.9]}}
+    The file is re-read whenever it changes, so panels can be tuned while running.
+    """
+
+    def __init__(self, path: Optional[str], defaults: Dict[str, Dict[str, Any]]):
+        self.path = path
+        self.defaults = defaults
+        self.mtime: Optional[float] = None
+        self.calibrations = self.build(defaults)
+
+    @staticmethod
+    def build(settings: Dict[str, Dict[str, Any]]) -> Dict[str, ColorCalibration]:
+        return {ip: ColorCalibration(**values) for ip, values in settings.items()}
+
+    def get(self, ip: str) -> ColorCalibration:
+        self.reload_if_changed()
+        if ip not in self.calibrations:
+            self.calibrations[ip] = ColorCalibration()
+        return self.calibrations[ip]
+
+    def reload_if_changed(self) -> None:
+        """
+        Re-read the file when it changes. A file that cannot be read or holds
+        invalid settings is logged once and the previous calibrations stay.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return
+        self.mtime = mtime
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                calibrations = self.build({**self.defaults, **json.load(f)})
+        except Exception as e:
+            logging.error(
+                f"Failed to load panel calibration from '{self.path}', "
+                f"keeping the previous one: {e}"
+            )
+            return
+        self.calibrations = calibrations
+        logging.info(f"Loaded panel calibration from: {self.path}")
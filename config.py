@@ -20,35 +20,155 @@ DEBUG_MODE = False
 # ZeroMQ settings
 ZMQ_PUB_PORT = 5555
 ZMQ_PUB_BIND_ADDR = f"tcp://*:{ZMQ_PUB_PORT}"
+# Set to the broker's frontend (e.g. "tcp://broker-host:5556") to publish through
+# gsi_broker.py instead of binding ZMQ_PUB_BIND_ADDR
+ZMQ_PUB_CONNECT_ADDR = None
+GSI_SOURCE = ""  # Name of this gaming PC; prefixes its topics when sharing a broker
+
+# ZeroMQ broker (gsi_broker.py): publishers connect to the frontend, subscribers
+# to the backend
+ZMQ_BROKER_FRONTEND_BIND = "tcp://*:5556"
+ZMQ_BROKER_BACKEND_BIND = "tcp://*:5557"
+ZMQ_BROKER_HWM = 1000  # Messages queued per peer before the broker drops updates
+ZMQ_BROKER_STATS_INTERVAL = 10  # In seconds, per-topic rate logging (None disables)
 
 # Pixoo display IP
 PIXOO_IP = "192.168.68.65"
 
+# Final-frame color calibration per Pixoo IP (brightness, gamma, white_balance).
+# The JSON file, if present, overrides these and is re-read when it changes.
+PIXOO_CALIBRATIONS = {
+    PIXOO_IP: {"brightness": 1.0, "gamma": 1.0, "white_balance": (1.0, 1.0, 1.0)},
+}
+PIXOO_CALIBRATION_FILE = os.path.join(PROJECT_ROOT, "pixoo_calibration.json")
+
+# ZeroMQ topics: full HUD updates, and a small state message that is only
+# published when game state, pause or hero alive status change
+ZMQ_HUD_TOPIC = "hud"
+ZMQ_SCOREBOARD_TOPIC = "scoreboard"  # All ten players, from spectator (allplayers) data
+ZMQ_STATE_TOPIC = "state"
+ZMQ_STATE_HEARTBEAT = 10  # In seconds, re-publish unchanged state at most this often
+
+# Named field projections: each payload is pruned to these dotted paths before it
+# is published ("*" matches any key at that level, None publishes everything)
+GSI_PROJECTIONS = {
+    "hud": [
+        "map.game_state",
+        "map.clock_time",
+        "map.paused",
+        "player.kills",
+        "player.deaths",
+        "player.assists",
+        "player.gold",
+        "hero.name",
+        "hero.level",
+        "hero.alive",
+        "hero.health",
+        "hero.max_health",
+        "hero.mana",
+        "hero.max_mana",
+        "items.slot0.name",
+        "items.slot1.name",
+        "items.slot2.name",
+        "items.slot3.name",
+        "items.slot4.name",
+        "items.slot5.name",
+        "items.slot0.cooldown",
+        "items.slot1.cooldown",
+        "items.slot2.cooldown",
+        "items.slot3.cooldown",
+        "items.slot4.cooldown",
+        "items.slot5.cooldown",
+        "items.teleport0.name",
+        "items.neutral0.name",
+        "abilities.*.name",
+        "abilities.*.level",
+        "abilities.*.cooldown",
+    ],
+    "scoreboard": [
+        "map.game_state",
+        "map.paused",
+        "player.*.*.kills",
+        "player.*.*.deaths",
+        "player.*.*.assists",
+        "player.*.*.net_worth",
+        "hero.*.*.name",
+        "hero.*.*.alive",
+    ],
+    "full": None,
+}
+# Topic -> projection published on it (only encoded while someone subscribes)
+ZMQ_TOPIC_PROJECTIONS = {ZMQ_HUD_TOPIC: "hud", ZMQ_SCOREBOARD_TOPIC: "scoreboard"}
+
+# Wire compression: each topic is published once per codec that has subscribers.
+# "zstd" needs the zstandard package and a dictionary trained on captured payloads
+ZMQ_PUBLISH_CODECS = ["json"]
+GSI_ZSTD_DICTIONARY = os.path.join(CACHE_DIR, "gsi_payloads.zdict")
+GSI_ZSTD_LEVEL = 3
+GSI_CAPTURE_DIR = None  # Set to a directory to save published bodies for training
+
 # ZeroMQ subscriber config
 ZMQ_SUBSCRIBE_ADDR = "tcp://localhost:5555"
-ZMQ_SUBSCRIBE_TOPIC = ""  # Subscribe to all topics
+ZMQ_SUBSCRIBE_CODEC = "json"  # "zstd" for remote renderers on a busy LAN
+ZMQ_SUBSCRIBE_SOURCE = ""  # GSI_SOURCE of the gaming PC to follow through a broker
 
 # Path to Steam's Dota 2 GSI config directory (customize if needed)
 STEAM_GSI_CONFIG_DIR = expanduser(
     "C:/Program Files (x86)/Steam/steamapps/common/dota 2 beta/game/dota/cfg/gamestate_integration"
 )
 
-# Name of the config file to create
-GSI_CONFIG_FILENAME = "gamestate_integration_custom.cfg"
+# Name of each generated config file
+GSI_CONFIG_FILENAME = "gamestate_integration_{name}.cfg"  # {name}: the receiver's name
 
 # GSI Config Details
-UPDATE_INTERVAL = "1"  # In seconds, how often data is sent from GSI
+# Layout drawn by the subscriber; decides which GSI providers are enabled and the
+# topic it subscribes to: "hero" (own hero) or "scoreboard" (spectating, all ten players)
+HUD_LAYOUT = "hero"
+TARGET_FPS = 1.0  # HUD updates per second; GSI throttle/buffer are derived from it
+LAYOUT_TOPICS = {"hero": ZMQ_HUD_TOPIC, "scoreboard": ZMQ_SCOREBOARD_TOPIC}
+# Scoreboard paging: 10 fits one panel; 5 puts Radiant and Dire on pages 0 and 1
+SCOREBOARD_PAGE_SIZE = 10
+SCOREBOARD_PAGE = 0  # Page shown by this subscriber's panel
+SCOREBOARD_FRAME_BUDGET = 0.25  # Fraction of a frame interval spent redrawing rows
+GSI_HEARTBEAT = 30.0  # In seconds, max time between GSI posts when nothing changes
+# One GSI config is generated per receiver (e.g. one per gaming PC at a venue);
+# "layout" and "fps" override HUD_LAYOUT and TARGET_FPS for that receiver
+GSI_RECEIVERS = [
+    {"name": "custom", "ip": GSI_RECEIVER_IP, "port": GSI_RECEIVER_PORT},
+]
 GSI_TIMEOUT = (
     5000  # Max time (in milliseconds) to wait for a GSI message before assuming no data
 )
+GSI_IDLE_TIMEOUT = 65000  # Same, while idle and only listening for state changes
+DAEMON_MODE = True  # Park and wait for the next match instead of exiting on timeout
+# {view}: the layout, and page for the scoreboard, so each subscriber has its own file
+HUD_SNAPSHOT_PATH = os.path.join(CACHE_DIR, "hud_snapshot_{view}.pkl")  # None disables
+LOW_POWER_IDLE = True  # Stop rendering and only wake on state changes while idle
+
+# Game state debouncing
+GAME_STATE_LEAVE_CONFIRMATIONS = 3  # Consecutive messages needed before leaving a state
+GAME_STATE_MIN_DWELL = 2.0  # Minimum seconds between committed state transitions
+
+# HUD animation settings
+ANIMATION_FRAME_MS = 100  # Frame duration for transitions uploaded as one animation
+HP_EASING_THRESHOLD = 0.1  # Minimum HP ratio change that gets an eased transition
+
+# Cooldown overlay: radial sweeps on inventory slots and a compact ability row.
+# Also enables the "abilities" GSI provider for the hero layout
+COOLDOWN_OVERLAY = True
+COOLDOWN_SWEEP_STEPS = 16  # Precomputed sweep masks per icon size
 
 # Dota 2 CDN Details
 GOLD_ICON_PATH = os.path.join(ASSETS_DIR, "gold.png")
 HERO_CACHE_DIR = os.path.join(CACHE_DIR, "heroes")
 ITEM_CACHE_DIR = os.path.join(CACHE_DIR, "items")
+ABILITY_CACHE_DIR = os.path.join(CACHE_DIR, "abilities")
 HERO_URL_TEMPLATE = (
     "https://cdn.cloudflare.steamstatic.com/apps/dota2/images/dota_react/heroes"
 )
 ITEM_URL_TEMPLATE = (
     "https://cdn.cloudflare.steamstatic.com/apps/dota2/images/dota_react/items"
 )
+ABILITY_URL_TEMPLATE = (
+    "https://cdn.cloudflare.steamstatic.com/apps/dota2/images/dota_react/abilities"
+)
@@ -0,0 +1,78 @@
+import math
+from typing import Dict, List, Tuple
+from PIL import Image, ImageDraw
+
+COOLDOWN_SHADE = (0, 0, 0, 255)  # Opaque black; RGB images use the first three
+SHADE_ALPHA = 170  # How dark the part still on cooldown is drawn
+SUPERSAMPLE = 4  # Sweeps are drawn this much larger, then downsampled
+
+# (icon size, steps) -> masks indexed by quantized cooldown fraction
+SWEEP_MASK_CACHE: Dict[Tuple[Tuple[int, int], int], List[Image.Image]] = {}
+
+
+def build_sweep_masks(size: Tuple[int, int], steps: int) -> List[Image.Image]:
+    """
+    Masks 0..steps for one icon size: mask i shades the i/steps of the icon
+    still on cooldown, clockwise from 12 o'clock like the in-game sweep.
+    Mask 0 is empty and mask `steps` covers the whole icon.
+    """
+    w, h = size[0] * SUPERSAMPLE, size[1] * SUPERSAMPLE
+    # A circle around the icon's corners, so the slice covers the full square
+    radius = max(w, h)
+    bbox = [w / 2 - radius, h / 2 - radius, w / 2 + radius, h / 2 + radius]
+
+    masks = []
+    for i in range(steps + 1):
+        mask = Image.new("L", (w, h), 0)
+        if i:
+            elapsed = 360 * (steps - i) / steps
+            ImageDraw.Draw(mask).pieslice(bbox, -90 + elapsed, 270, fill=SHADE_ALPHA)
+        masks.append(mask.resize(size, Image.Resampling.BOX))
+    return masks
+
+
+def get_sweep_masks(size: Tuple[int, int], steps: int) -> List[Image.Image]:
+    key = (size, steps)
+    if key not in SWEEP_MASK_CACHE:
+        SWEEP_MASK_CACHE[key] = build_sweep_masks(size, steps)
+    return SWEEP_MASK_CACHE[key]
+
+
+def quantize_fraction(fraction: float, steps: int) -> int:
+    """Mask index for a remaining-cooldown fraction; any cooldown shows at least step 1."""
+    return max(0, min(steps, math.ceil(fraction * steps)))
+
+
+def shade_cooldown(
+    img: Image.Image, position: Tuple[int, int], size: Tuple[int, int], mask: Image.Image
+) -> None:
+    """Darken the icon at `position` through a precomputed sweep mask."""
+    x, y = position
+    shade = COOLDOWN_SHADE if img.mode == "RGBA" else COOLDOWN_SHADE[:3]
+    img.paste(shade, (x, y, x + size[0], y + size[1]), mask)
+
+
+class CooldownTracker:
+    """
+    GSI reports the seconds left on a cooldown but not its full length, so the
+    longest value seen since the cooldown started stands in for it. Cooldowns
+    that were already running when first seen start out as a full sweep.
+    """
+
+    def __init__(self, steps: int):
+        self.steps = steps
+        self.longest: Dict[str, float] = {}
+        self.names: Dict[str, str] = {}
+
+    def step(self, key: str, name: str, cooldown: float) -> int:
+        """Quantized remaining fraction for the item/ability in slot `key`."""
+        if self.names.get(key) != name:
+            self.names[key] = name
+            self.longest.pop(key, None)
+        if cooldown <= 0:
+            self.longest.pop(key, None)
+            return 0
+        longest = self.longest.get(key, 0.0)
+        if cooldown > longest:
+            self.longest[key] = longest = cooldown
+        return quantize_fraction(cooldown / longest, self.steps)
@@ -1,22 +1,127 @@
 import os
 import logging
 from textwrap import dedent
+from typing import Any, Dict, Iterable, List, Tuple
+from hud_renderer import HUDRenderer
+from scoreboard_renderer import ScoreboardRenderer
 from config import (
     GSI_RECEIVER_IP,
     GSI_RECEIVER_PORT,
     STEAM_GSI_CONFIG_DIR,
     GSI_CONFIG_FILENAME,
-    UPDATE_INTERVAL,
+    HUD_LAYOUT,
+    TARGET_FPS,
+    COOLDOWN_OVERLAY,
+    GSI_HEARTBEAT,
+    GSI_RECEIVERS,
 )
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
+# Renderer for each HUD layout; its GSI_PROVIDERS decide the enabled data blocks
+HUD_LAYOUTS = {
+    "hero": HUDRenderer,
+    "scoreboard": ScoreboardRenderer,
+}
+
+# Every data block the GSI config understands, in the order the game documents them
+GSI_PROVIDERS = (
+    "provider",
+    "map",
+    "player",
+    "hero",
+    "abilities",
+    "items",
+    "wearables",
+    "auth",
+    "draft",
+    "buildings",
+    "allplayers",
+)
+
+# Hand-picked rough sizes in bytes of each block in a typical in-game payload,
+# including its share of the "previously"/"added" diff blocks. These are fixed
+# guesses, not measurements: they only compare layouts, real payloads vary by
+# hero, items and game phase
+PROVIDER_PAYLOAD_BYTES = {
+    "provider": 110,
+    "map": 420,
+    "player": 650,
+    "hero": 720,
+    "abilities": 1500,
+    "items": 2700,
+    "wearables": 950,
+    "auth": 60,
+    "draft": 2600,
+    "buildings": 1900,
+    "allplayers": 4800,
+}
+
+
+def layout_providers(layout: str) -> Tuple[str, ...]:
+    if layout not in HUD_LAYOUTS:
+        raise ValueError(f"Unknown HUD layout '{layout}'. Known: {list(HUD_LAYOUTS)}")
+    renderer = HUD_LAYOUTS[layout]
+    if COOLDOWN_OVERLAY:
+        return renderer.GSI_PROVIDERS + getattr(renderer, "OVERLAY_PROVIDERS", ())
+    return renderer.GSI_PROVIDERS
+
+
+def gsi_timing(fps: float) -> Dict[str, float]:
+    """
+    Derive GSI timing from the target HUD frame rate. `throttle` caps posts at one
+    per frame; `buffer` collects bursts of changes for half a frame so a post
+    never lags the frame it feeds by more than that.
+    """
+    throttle = round(1 / fps, 3)
+    return {
+        "timeout": 5.0,
+        "buffer": round(throttle / 2, 3),
+        "throttle": throttle,
+        "heartbeat": GSI_HEARTBEAT,
+    }
+
+
+def estimate_payload_size(providers: Iterable[str]) -> int:
+    """Rough constant estimate from PROVIDER_PAYLOAD_BYTES; nothing is measured."""
+    return sum(PROVIDER_PAYLOAD_BYTES[name] for name in providers)
+
+
+def build_gsi_config(
+    ip: str, port: int, layout: str = HUD_LAYOUT, fps: float = TARGET_FPS
+) -> str:
+    enabled = set(layout_providers(layout))
+    timing = gsi_timing(fps)
+    data_lines = "\n".join(
+        f'                "{name}" {" " * (10 - len(name))}"{int(name in enabled)}"'
+        for name in GSI_PROVIDERS
+    )
+
+    return dedent(
+        f"""
+        "Custom GSI Configuration"
+        {{
+            "uri" "http://{ip}:{port}/"
+            "timeout" "{timing['timeout']}"
+            "buffer"  "{timing['buffer']}"
+            "throttle" "{timing['throttle']}"
+            "heartbeat" "{timing['heartbeat']}"
+            "data"
+            {{
+{data_lines}
+            }}
+        }}
+    """
+    ).strip()
+
 
 def create_gsi_config(
     ip: str = GSI_RECEIVER_IP,
     port: int = GSI_RECEIVER_PORT,
     path: str = STEAM_GSI_CONFIG_DIR,
-    filename: str = GSI_CONFIG_FILENAME,
+    filename: str = GSI_CONFIG_FILENAME.format(name="custom"),
+    layout: str = HUD_LAYOUT,
+    fps: float = TARGET_FPS,
 ) -> None:
     try:
         os.makedirs(path, exist_ok=True)
@@ -26,33 +131,7 @@ def create_gsi_config(
         return
 
     config_path = os.path.join(path, filename)
-
-    config_content = dedent(
-        f"""
-        "Custom GSI Configuration"
-        {{
-            "uri" "http://{ip}:{port}/"
-            "timeout" "5.0"
-            "buffer"  "{UPDATE_INTERVAL}"
-            "throttle" "{UPDATE_INTERVAL}"
-            "heartbeat" "30.0"
-            "data"
-            {{
-                "provider"   "1"
-                "map"        "1"
-                "player"     "1"
-                "hero"       "1"
-                "abilities"  "0"
-                "items"      "1"
-                "wearables"  "0"
-                "auth"       "0"
-                "draft"      "0"
-                "buildings"  "0"
-                "allplayers" "0"
-            }}
-        }}
-    """
-    ).strip()
+    config_content = build_gsi_config(ip, port, layout, fps)
 
     try:
         with open(config_path, "w", encoding="utf-8") as f:
@@ -60,7 +139,33 @@ def create_gsi_config(
         logging.info(f"GSI config written to: {config_path}")
     except Exception as e:
         logging.error(f"Failed to write GSI config to '{config_path}': {e}")
+        return
+
+    payload_size = estimate_payload_size(layout_providers(layout))
+    logging.info(
+        f"Layout '{layout}' at {fps} fps: rough estimate ~{payload_size} bytes per "
+        f"update (~{payload_size * fps / 1024:.1f} KiB/s), vs "
+        f"~{estimate_payload_size(GSI_PROVIDERS)} bytes with every provider enabled "
+        "(fixed per-provider guesses, not measured)"
+    )
+
+
+def create_gsi_configs(
+    receivers: List[Dict[str, Any]] = GSI_RECEIVERS, path: str = STEAM_GSI_CONFIG_DIR
+) -> None:
+    """
+    Write one GSI config per receiver, e.g. one per renderer box at a venue.
+    """
+    for receiver in receivers:
+        create_gsi_config(
+            ip=receiver["ip"],
+            port=receiver["port"],
+            path=path,
+            filename=GSI_CONFIG_FILENAME.format(name=receiver["name"]),
+            layout=receiver.get("layout", HUD_LAYOUT),
+            fps=receiver.get("fps", TARGET_FPS),
+        )
 
 
 if __name__ == "__main__":
-    create_gsi_config()
+    create_gsi_configs()
@@ -1,14 +1,18 @@
 import os
+import pickle
 import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageEnhance
-from typing import Tuple
+from typing import Any, Dict, Iterable, List, Set, Tuple
 from config import (
     HERO_CACHE_DIR,
     ITEM_CACHE_DIR,
+    ABILITY_CACHE_DIR,
     GOLD_ICON_PATH,
     HERO_URL_TEMPLATE,
     ITEM_URL_TEMPLATE,
+    ABILITY_URL_TEMPLATE,
 )
 
 # Configure logging
@@ -17,8 +21,65 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 # In-memory caches
 HEROPORTRAIT_CACHE: dict[str, Image.Image] = {}
 ITEMICON_CACHE: dict[str, Image.Image] = {}
+ABILITYICON_CACHE: dict[str, Image.Image] = {}
 BRIGHTEN_CACHE: dict[Tuple[int, float], Image.Image] = {}
 GOLDICON_CACHE: dict[Tuple[int, int], Image.Image] = {}
+HEROTHUMB_CACHE: dict[Tuple[str, Tuple[int, int]], Image.Image] = {}
+
+
+def snapshot_caches() -> Dict[str, Dict[Any, Image.Image]]:
+    """
+    The decoded asset caches, for persisting across restarts. BRIGHTEN_CACHE is
+    keyed by object id and cannot outlive the process, so it is left out.
+    """
+    return {
+        "heroes": HEROPORTRAIT_CACHE,
+        "items": ITEMICON_CACHE,
+        "abilities": ABILITYICON_CACHE,
+        "gold": GOLDICON_CACHE,
+        "hero_thumbs": HEROTHUMB_CACHE,
+    }
+
+
+def restore_caches(snapshot: Dict[str, Dict[Any, Image.Image]]) -> None:
+    HEROPORTRAIT_CACHE.update(snapshot.get("heroes", {}))
+    ITEMICON_CACHE.update(snapshot.get("items", {}))
+    ABILITYICON_CACHE.update(snapshot.get("abilities", {}))
+    GOLDICON_CACHE.update(snapshot.get("gold", {}))
+    HEROTHUMB_CACHE.update(snapshot.get("hero_thumbs", {}))
+
+
+def save_cache_snapshot(path: str, layers: Dict[Any, Any]) -> None:
+    """
+    Persist the decoded asset caches, plus a renderer's own prerendered
+    `layers`, so the next start is warm. Every renderer uses this one format.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump({"layers": layers, "icons": snapshot_caches()}, f)
+        logging.info(f"Cache snapshot written to: {path}")
+    except Exception as e:
+        logging.error(f"Failed to write cache snapshot to '{path}': {e}")
+
+
+def load_cache_snapshot(path: str) -> Dict[Any, Any]:
+    """
+    Restore the asset caches from a snapshot written by save_cache_snapshot and
+    return its layers; empty when there is no readable snapshot.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+        layers = snapshot["layers"]
+        restore_caches(snapshot["icons"])
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable cache snapshot '{path}': {e}")
+        return {}
+    logging.info(f"Loaded cache snapshot from: {path}")
+    return layers
 
 
 def get_hero_portrait_cached(hero_name: str) -> Image.Image:
@@ -55,6 +116,46 @@ def get_hero_portrait_cached(hero_name: str) -> Image.Image:
     return img
 
 
+def get_hero_thumbnails_cached(
+    hero_names: Iterable[str], size: Tuple[int, int]
+) -> Tuple[List[Image.Image], Set[str]]:
+    """
+    Hero portraits for several heroes at one small size (e.g. scoreboard rows),
+    in the order given, and the hero ids whose portrait failed to load. Those
+    get the grey placeholder without caching it, so the caller can look them
+    up again later. Portraits missing from the caches are downloaded in
+    parallel, so a cold scoreboard waits for one download instead of ten.
+    """
+    hero_ids = [name.replace("npc_dota_hero_", "") for name in hero_names]
+    missing = {
+        hero_id
+        for hero_id in hero_ids
+        if hero_id not in ("", "unknown") and (hero_id, size) not in HEROTHUMB_CACHE
+    }
+
+    def load(hero_id: str) -> None:
+        try:
+            portrait = get_hero_portrait_cached(f"npc_dota_hero_{hero_id}")
+        except Exception as e:
+            logging.error(f"[!] Failed to load hero portrait {hero_id}: {e}")
+            return
+        HEROTHUMB_CACHE[(hero_id, size)] = portrait.resize(
+            size, Image.Resampling.LANCZOS
+        )
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            list(pool.map(load, missing))
+
+    fallback = HEROTHUMB_CACHE.get(("unknown", size))
+    if fallback is None:
+        fallback = Image.new("RGBA", size, (50, 50, 50, 255))
+        HEROTHUMB_CACHE[("unknown", size)] = fallback
+    failed = {hero_id for hero_id in missing if (hero_id, size) not in HEROTHUMB_CACHE}
+    portraits = [HEROTHUMB_CACHE.get((hero_id, size), fallback) for hero_id in hero_ids]
+    return portraits, failed
+
+
 def get_item_icon_cached(
     item_name: str, size: Tuple[int, int] = (15, 15)
 ) -> Image.Image:
@@ -81,6 +182,31 @@ def get_item_icon_cached(
     return img
 
 
+def get_ability_icon_cached(
+    ability_name: str, size: Tuple[int, int] = (6, 6)
+) -> Image.Image:
+    """
+    Download and cache a resized Dota 2 ability icon.
+    """
+    if ability_name in ABILITYICON_CACHE:
+        return ABILITYICON_CACHE[ability_name]
+
+    os.makedirs(ABILITY_CACHE_DIR, exist_ok=True)
+    local_path = os.path.join(ABILITY_CACHE_DIR, f"{ability_name}.png")
+
+    if not os.path.exists(local_path):
+        url = f"{ABILITY_URL_TEMPLATE}/{ability_name}.png"
+        logging.info(f"[↓] Downloading ability icon: {url}")
+        response = requests.get(url)
+        response.raise_for_status()
+        with open(local_path, "wb") as f:
+            f.write(response.content)
+
+    img = Image.open(local_path).convert("RGBA").resize(size, Image.Resampling.LANCZOS)
+    ABILITYICON_CACHE[ability_name] = img
+    return img
+
+
 def brighten_image_cached(img: Image.Image, factor: float = 1.5) -> Image.Image:
     """
     Return a brightened version of the image, using a cache for repeated enhancements.
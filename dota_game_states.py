@@ -1,4 +1,6 @@
+import time
 from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
 
 
 class GameState(Enum):
@@ -11,3 +13,99 @@ class GameState(Enum):
     GAME_IN_PROGRESS = "DOTA_GAMERULES_STATE_GAME_IN_PROGRESS"
     POST_GAME = "DOTA_GAMERULES_STATE_POST_GAME"
     CUSTOM_GAME_SETUP = "DOTA_GAMERULES_STATE_CUSTOM_GAME_SETUP"
+
+
+# States in which the HUD is drawn; every other state is idle (nothing rendered)
+ACTIVE_STATES = frozenset({GameState.PRE_GAME, GameState.GAME_IN_PROGRESS})
+IDLE_STATES = frozenset(GameState) - ACTIVE_STATES
+
+
+class GameStateMachine:
+    """
+    Debounced view of `map.game_state`.
+
+    A new state is only committed once it has been seen on `leave_confirmations`
+    consecutive messages (a single message is enough to enter an active state),
+    and never sooner than `min_dwell` seconds after the previous transition. This
+    keeps UNKNOWN payloads during reconnects from bouncing the display between
+    channels.
+    """
+
+    def __init__(
+        self,
+        leave_confirmations: int = 3,
+        min_dwell: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.leave_confirmations = leave_confirmations
+        self.min_dwell = min_dwell
+        self.clock = clock
+        self.state = GameState.UNKNOWN
+        self.entered_at: Optional[float] = None
+        self.candidate: Optional[GameState] = None
+        self.candidate_count = 0
+
+    @staticmethod
+    def parse(raw_state: str) -> GameState:
+        return GameState._value2member_map_.get(raw_state, GameState.UNKNOWN)
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    @property
+    def is_idle(self) -> bool:
+        return self.state in IDLE_STATES
+
+    def update(self, raw_state: str) -> Optional[GameState]:
+        """
+        Feed the raw `map.game_state` of one message.
+        Returns the newly committed state on a transition, otherwise None.
+        """
+        observed = self.parse(raw_state)
+        if observed == self.state:
+            self.candidate, self.candidate_count = None, 0
+            return None
+
+        if observed == self.candidate:
+            self.candidate_count += 1
+        else:
+            self.candidate, self.candidate_count = observed, 1
+
+        required = 1 if observed in ACTIVE_STATES else self.leave_confirmations
+        now = self.clock()
+        if self.candidate_count < required or (
+            self.entered_at is not None and now - self.entered_at < self.min_dwell
+        ):
+            return None
+
+        self.state, self.entered_at = observed, now
+        self.candidate, self.candidate_count = None, 0
+        return observed
+
+
+def state_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The subset of a GSI payload that decides whether the HUD needs drawing.
+    Published on its own topic so idle subscribers only wake when it changes.
+    """
+    map_data = data.get("map", {})
+    return {
+        "map": {
+            "game_state": map_data.get("game_state", "UNKNOWN"),
+            "paused": map_data.get("paused", False),
+        },
+        "hero": {"alive": data.get("hero", {}).get("alive", True)},
+    }
+
+
+def state_signature(data: Dict[str, Any]) -> Tuple[str, bool, bool]:
+    """
+    (game_state, paused, alive) for a full payload or a `state_fields` message.
+    """
+    fields = state_fields(data)
+    return (
+        fields["map"]["game_state"],
+        fields["map"]["paused"],
+        fields["hero"]["alive"],
+    )
@@ -0,0 +1,99 @@
+import zmq
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from config import (
+    ZMQ_BROKER_FRONTEND_BIND,
+    ZMQ_BROKER_BACKEND_BIND,
+    ZMQ_BROKER_HWM,
+    ZMQ_BROKER_STATS_INTERVAL,
+)
+
+# Logging Setup
+logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+CAPTURE_ADDR = "inproc://gsi-broker-capture"
+
+
+def setup_proxy_sockets(
+    context: zmq.Context, frontend_addr: str, backend_addr: str, hwm: int
+) -> List[zmq.Socket]:
+    """
+    XSUB frontend for gsi_pub.py instances (one per gaming PC) and XPUB backend
+    for pixoo_sub.py renderers. Subscriptions flow back through the proxy, so
+    publishers still only encode what some renderer is listening to.
+    """
+    frontend = context.socket(zmq.XSUB)
+    frontend.setsockopt(zmq.RCVHWM, hwm)
+    frontend.bind(frontend_addr)
+    logging.info(f"Broker frontend (publishers) bound to {frontend_addr}")
+
+    backend = context.socket(zmq.XPUB)
+    backend.setsockopt(zmq.SNDHWM, hwm)
+    backend.bind(backend_addr)
+    logging.info(f"Broker backend (subscribers) bound to {backend_addr}")
+    return [frontend, backend]
+
+
+def report_stats(context: zmq.Context, interval: float) -> None:
+    """
+    Count messages passing through the proxy per wire topic and log the rates.
+    """
+    capture = context.socket(zmq.SUB)
+    capture.setsockopt(zmq.SUBSCRIBE, b"")
+    capture.connect(CAPTURE_ADDR)
+    messages: Dict[bytes, int] = defaultdict(int)
+    sizes: Dict[bytes, int] = defaultdict(int)
+    last_report = time.monotonic()
+
+    while True:
+        if capture.poll(timeout=1000):
+            frames = capture.recv_multipart()
+            # Single-frame \x00/\x01 messages are subscription events, not data
+            if len(frames) > 1:
+                messages[frames[0]] += 1
+                sizes[frames[0]] += sum(len(frame) for frame in frames[1:])
+
+        elapsed = time.monotonic() - last_report
+        if elapsed >= interval:
+            for topic in sorted(messages):
+                logging.info(
+                    f"[📊] {topic.decode()}: {messages[topic] / elapsed:.1f} msg/s, "
+                    f"{sizes[topic] / elapsed / 1024:.1f} KiB/s"
+                )
+            messages.clear()
+            sizes.clear()
+            last_report = time.monotonic()
+
+
+def run_broker(
+    frontend_addr: str = ZMQ_BROKER_FRONTEND_BIND,
+    backend_addr: str = ZMQ_BROKER_BACKEND_BIND,
+    hwm: int = ZMQ_BROKER_HWM,
+    stats_interval: Optional[float] = ZMQ_BROKER_STATS_INTERVAL,
+) -> None:
+    context = zmq.Context()
+    frontend, backend = setup_proxy_sockets(context, frontend_addr, backend_addr, hwm)
+
+    capture = None
+    if stats_interval:
+        # PUB so a slow stats thread drops samples instead of stalling the proxy
+        capture = context.socket(zmq.PUB)
+        capture.setsockopt(zmq.SNDHWM, hwm)
+        capture.bind(CAPTURE_ADDR)
+        threading.Thread(
+            target=report_stats,
+            args=(context, stats_interval),
+            name="broker-stats",
+            daemon=True,
+        ).start()
+
+    # Runs until the process is stopped
+    zmq.proxy(frontend, backend, capture)
+
+
+# --- Run the Broker ---
+if __name__ == "__main__":
+    run_broker()
@@ -0,0 +1,116 @@
+"""
+Wire format for GSI messages between gsi_pub.py and its subscribers.
+
+Every message is three frames: [wire topic, header, body]. The wire topic is
+"[<source>/]<topic>/<codec>", so with several gaming PCs publishing through a
+broker each subscriber only receives the player and encoding it asked for,
+and the header names the codec (plus the dictionary ID for zstd) so a receiver
+can reject a body it cannot decode. Compression is optional and needs the
+`zstandard` package; train a dictionary from captured payloads with:
+
+    python gsi_codec.py <capture_dir> [dictionary_path]
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import GSI_ZSTD_DICTIONARY, GSI_ZSTD_LEVEL
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODECS = ("json", "zstd")
+
+
+def wire_topic(topic: str, codec: str, source: str = "") -> str:
+    return f"{source}/{topic}/{codec}" if source else f"{topic}/{codec}"
+
+
+class GSICodec:
+    """
+    Encodes/decodes message bodies for one codec. The zstd codec compresses
+    with a dictionary trained on captured GSI payloads, which is what makes
+    compressing small, repetitive JSON documents worthwhile.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dictionary_path: str = GSI_ZSTD_DICTIONARY,
+        level: int = GSI_ZSTD_LEVEL,
+    ):
+        if name not in CODECS:
+            raise ValueError(f"Unknown codec '{name}'. Known: {list(CODECS)}")
+        self.name = name
+        self.header = name.encode()
+        if name != "zstd":
+            return
+
+        if zstandard is None:
+            raise RuntimeError("The zstd codec needs the 'zstandard' package")
+        with open(dictionary_path, "rb") as f:
+            dictionary = zstandard.ZstdCompressionDict(f.read())
+        self.header = f"zstd:{dictionary.dict_id()}".encode()
+        # zstandard (de)compressors are not thread-safe; Flask serves requests
+        # from several threads, so each call takes the codec's lock
+        self.lock = threading.Lock()
+        self.compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary)
+        self.decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+
+    def encode(self, body: bytes) -> bytes:
+        if self.name == "json":
+            return body
+        with self.lock:
+            return self.compressor.compress(body)
+
+    def decode(self, header: bytes, body: bytes) -> bytes:
+        if header != self.header:
+            raise ValueError(
+                f"Cannot decode a '{header.decode()}' body with codec '{self.header.decode()}'"
+            )
+        if self.name == "json":
+            return body
+        with self.lock:
+            return self.decompressor.decompress(body)
+
+    def decode_message(self, frames: List[bytes]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Split a received [wire topic, header, body] message into (topic, payload).
+        """
+        topic, header, body = frames
+        return topic.decode().split("/")[-2], json.loads(self.decode(header, body))
+
+
+def train_dictionary(
+    samples: Iterable[bytes], dictionary_path: str = GSI_ZSTD_DICTIONARY, size: int = 16384
+) -> None:
+    if zstandard is None:
+        raise RuntimeError("Training a dictionary needs the 'zstandard' package")
+    dictionary = zstandard.train_dictionary(size, list(samples))
+    os.makedirs(os.path.dirname(dictionary_path) or ".", exist_ok=True)
+    with open(dictionary_path, "wb") as f:
+        f.write(dictionary.as_bytes())
+    logging.info(f"Dictionary {dictionary.dict_id()} written to: {dictionary_path}")
+
+
+def load_captured_samples(capture_dir: str) -> List[bytes]:
+    samples = []
+    for name in sorted(os.listdir(capture_dir)):
+        with open(os.path.join(capture_dir, name), "rb") as f:
+            samples.append(f.read())
+    return samples
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    if len(sys.argv) < 2:
+        sys.exit(f"Usage: python {sys.argv[0]} <capture_dir> [dictionary_path]")
+    dictionary_path: Optional[str] = sys.argv[2] if len(sys.argv) > 2 else None
+    train_dictionary(
+        load_captured_samples(sys.argv[1]), dictionary_path or GSI_ZSTD_DICTIONARY
+    )
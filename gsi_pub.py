@@ -1,8 +1,27 @@
 from flask import Flask, request, jsonify
 import zmq
+import os
+import json
 import logging
-from typing import Any
-from config import ZMQ_PUB_BIND_ADDR, LOCAL_DOTA_HOST, LOCAL_DOTA_PORT, DEBUG_MODE
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from dota_game_states import state_fields, state_signature
+from gsi_codec import GSICodec, wire_topic
+from config import (
+    ZMQ_PUB_BIND_ADDR,
+    ZMQ_PUB_CONNECT_ADDR,
+    GSI_SOURCE,
+    ZMQ_PUBLISH_CODECS,
+    GSI_CAPTURE_DIR,
+    ZMQ_STATE_TOPIC,
+    ZMQ_STATE_HEARTBEAT,
+    ZMQ_TOPIC_PROJECTIONS,
+    GSI_PROJECTIONS,
+    LOCAL_DOTA_HOST,
+    LOCAL_DOTA_PORT,
+    DEBUG_MODE,
+)
 
 # Logging Setup
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
@@ -12,15 +31,148 @@ app = Flask(__name__)
 
 
 # ZeroMQ Setup
-def setup_pub_socket(bind_addr: str) -> zmq.Socket:
+def setup_pub_socket(bind_addr: str, connect_addr: Optional[str] = None) -> zmq.Socket:
+    # XPUB rather than PUB so we can see which topic/codec pairs are subscribed
+    # and skip projecting or compressing anything nobody listens to. Through a
+    # broker the subscriptions arrive via its XSUB frontend.
     context = zmq.Context()
-    socket = context.socket(zmq.PUB)
-    socket.bind(bind_addr)
-    logging.info(f"ZeroMQ PUB socket bound to {bind_addr}")
+    socket = context.socket(zmq.XPUB)
+    if connect_addr:
+        socket.connect(connect_addr)
+        logging.info(f"ZeroMQ XPUB socket connected to broker at {connect_addr}")
+    else:
+        socket.bind(bind_addr)
+        logging.info(f"ZeroMQ XPUB socket bound to {bind_addr}")
     return socket
 
 
-pub_socket = setup_pub_socket(ZMQ_PUB_BIND_ADDR)
+pub_socket = setup_pub_socket(ZMQ_PUB_BIND_ADDR, ZMQ_PUB_CONNECT_ADDR)
+# Flask serves requests from several threads; ZeroMQ sockets are not thread-safe
+pub_lock = threading.Lock()
+codecs = [GSICodec(name) for name in ZMQ_PUBLISH_CODECS]
+# Wire topic prefixes with at least one subscriber
+subscriptions: Set[bytes] = set()
+capture_count = 0
+
+
+def poll_subscriptions() -> None:
+    """
+    Apply pending (un)subscribe events from the XPUB socket.
+    """
+    while True:
+        try:
+            event = pub_socket.recv(zmq.NOBLOCK)
+        except zmq.Again:
+            return
+        if event[:1] == b"\x01":
+            subscriptions.add(event[1:])
+        else:
+            subscriptions.discard(event[1:])
+
+
+def subscribed_codecs(topic: str) -> List[GSICodec]:
+    return [
+        codec
+        for codec in codecs
+        if any(
+            wire_topic(topic, codec.name, GSI_SOURCE).encode().startswith(prefix)
+            for prefix in subscriptions
+        )
+    ]
+
+
+def capture(topic: str, body: bytes) -> None:
+    """
+    Save published bodies as training samples for the zstd dictionary.
+    """
+    global capture_count
+    if GSI_CAPTURE_DIR is None:
+        return
+    os.makedirs(GSI_CAPTURE_DIR, exist_ok=True)
+    capture_count += 1
+    path = os.path.join(GSI_CAPTURE_DIR, f"{topic}-{capture_count:06d}.json")
+    with open(path, "wb") as f:
+        f.write(body)
+
+
+# Last state published on ZMQ_STATE_TOPIC, for change detection
+last_state_signature: Any = None
+last_state_time = 0.0
+
+
+# Projection stage: topic -> split field paths (None = publish unchanged)
+topic_projections: Dict[str, Optional[List[List[str]]]] = {
+    topic: (
+        None
+        if GSI_PROJECTIONS[name] is None
+        else [path.split(".") for path in GSI_PROJECTIONS[name]]
+    )
+    for topic, name in ZMQ_TOPIC_PROJECTIONS.items()
+}
+
+
+def copy_path(src: Dict[str, Any], dst: Dict[str, Any], keys: List[str]) -> None:
+    key, rest = keys[0], keys[1:]
+    for k in src if key == "*" else ([key] if key in src else []):
+        value = src[k]
+        if not rest:
+            dst[k] = value
+        elif isinstance(value, dict):
+            copy_path(value, dst.setdefault(k, {}), rest)
+
+
+def project(data: Dict[str, Any], paths: Optional[List[List[str]]]) -> Dict[str, Any]:
+    """
+    Prune a GSI payload down to the given field paths. Blocks that are not
+    listed (provider, previously/added, extra providers) are dropped.
+    """
+    if paths is None:
+        return data
+    projected: Dict[str, Any] = {}
+    for keys in paths:
+        copy_path(data, projected, keys)
+    return projected
+
+
+def publish(
+    topic: str, data: Dict[str, Any], paths: Optional[List[List[str]]] = None
+) -> List[Tuple[str, int]]:
+    """
+    Project and publish a payload once per codec subscribed to the topic.
+    Returns the (wire topic, bytes) actually sent.
+    """
+    targets = subscribed_codecs(topic)
+    if not targets:
+        return []
+    body = json.dumps(project(data, paths), separators=(",", ":")).encode()
+    capture(topic, body)
+
+    sent = []
+    for codec in targets:
+        wire = wire_topic(topic, codec.name, GSI_SOURCE)
+        encoded = codec.encode(body)
+        pub_socket.send_multipart([wire.encode(), codec.header, encoded])
+        sent.append((wire, len(encoded)))
+    return sent
+
+
+def publish_state_if_changed(data: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """
+    Publish the state fields when they change (or as a periodic heartbeat), so
+    idle subscribers can block on this topic instead of every update. Returns
+    the (wire topic, bytes) sent, like publish.
+    """
+    global last_state_signature, last_state_time
+    signature = state_signature(data)
+    now = time.monotonic()
+    if (
+        signature != last_state_signature
+        or now - last_state_time >= ZMQ_STATE_HEARTBEAT
+    ):
+        sent = publish(ZMQ_STATE_TOPIC, state_fields(data))
+        last_state_signature, last_state_time = signature, now
+        return sent
+    return []
 
 
 # Routes
@@ -30,8 +182,16 @@ def gsi() -> Any:
     if not data:
         return jsonify({"status": "no data"}), 400
 
-    logging.info("[GSI] Received update")
-    pub_socket.send_json(data)
+    with pub_lock:
+        poll_subscriptions()
+        sent = publish_state_if_changed(data)
+        sent += [
+            item
+            for topic, paths in topic_projections.items()
+            for item in publish(topic, data, paths)
+        ]
+    sizes = ", ".join(f"{wire}: {size} B" for wire, size in sent) or "no subscribers"
+    logging.info(f"[GSI] Received update ({request.content_length} B ➜ {sizes})")
     return jsonify({"status": "published"})
 
 
@@ -0,0 +1,27 @@
+from typing import List, Tuple
+from PIL import Image
+
+
+def flash_frames(
+    frame: Image.Image, color: Tuple[int, int, int], steps: int = 3
+) -> List[Image.Image]:
+    """
+    Fade a solid color flash out over the given frame (kill/level-up highlight).
+    The sequence ends on the untouched frame.
+    """
+    base = frame.convert("RGB")
+    overlay = Image.new("RGB", base.size, color)
+    return [
+        Image.blend(base, overlay, 0.6 * (steps - i) / steps) for i in range(steps)
+    ] + [base]
+
+
+def crossfade_frames(
+    start: Image.Image, end: Image.Image, steps: int = 4
+) -> List[Image.Image]:
+    """
+    Ease from one HUD frame to the next (e.g. HP/mana bar changes).
+    The sequence ends on `end`.
+    """
+    start, end = start.convert("RGB"), end.convert("RGB")
+    return [Image.blend(start, end, (i + 1) / steps) for i in range(steps)]
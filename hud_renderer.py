@@ -1,20 +1,55 @@
-import json
 import logging
+from typing import Dict, List, Optional, Tuple
 from PIL import Image, ImageDraw, ImageFont
+from cooldown_overlay import CooldownTracker, get_sweep_masks, shade_cooldown
 from dota_2_cdn import (
     get_hero_portrait_cached,
     get_item_icon_cached,
+    get_ability_icon_cached,
     brighten_image_cached,
     get_gold_icon_resized,
+    save_cache_snapshot,
+    load_cache_snapshot,
 )
 
+# Shared stand-in for a missing inventory slot; never mutated
+EMPTY_SLOT: dict = {}
+# Abilities GSI lists that have no place in the ability row
+HIDDEN_ABILITY_PREFIXES = ("generic_hidden", "special_bonus_", "plus_")
+
 
 class HUDRenderer:
-    def __init__(self):
+    """
+    Renders the hero HUD for one panel.
+
+    Frames are drawn into two preallocated canvases in turn (double buffering),
+    so a steady-state frame allocates no new images or draw contexts. A
+    returned frame stays valid until the second-next call to
+    `create_base_layout`; copy it to keep it longer.
+
+    With `cooldown_overlay`, inventory slots and a compact ability row along
+    the bottom of the portrait show cooldown sweeps. The sweeps are
+    precomputed masks indexed by the quantized remaining fraction, so the
+    inventory grid is only rebuilt when a sweep advances a step.
+    """
+
+    # GSI providers this layout reads (see create_dota_2_gsi_config.py)
+    GSI_PROVIDERS = ("map", "player", "hero", "items")
+    # Extra providers read only with the cooldown overlay
+    OVERLAY_PROVIDERS = ("abilities",)
+
+    def __init__(self, cooldown_overlay: bool = False, cooldown_steps: int = 16):
         # Caches for static layers and inventory images
         self.static_layer_cache = {}
-        self.last_inventory_key = None
+        self.last_inventory: Dict[str, Tuple[str, int]] = {}
         self.cached_inventory_image = None
+        self.last_abilities: List[Tuple[str, bool, int]] = []
+        self.cached_ability_row = None
+
+        # Front/back canvases and their draw contexts, reused every frame
+        self.buffers = [Image.new("RGBA", (64, 64)) for _ in range(2)]
+        self.buffer_draws = [ImageDraw.Draw(buffer) for buffer in self.buffers]
+        self.back_buffer = 0
 
         # Layout constants for inventory grid
         self.ITEM_SIZE = 12  # Target size for item icons
@@ -42,6 +77,31 @@ class HUDRenderer:
         self.VERDANA_FONT_9 = self.load_font("verdana.ttf", 9)
         self.VERDANA_FONT_8 = self.load_font("verdana.ttf", 8)
 
+        # K/D/A value rows: (y, font for 1 digit, font for 2+ digits, color)
+        self.KILLS_ROW = (-2, self.VERDANA_FONT_9, self.VERDANA_FONT_8, (0, 255, 0))
+        self.DEATHS_ROW = (6, self.VERDANA_FONT_9, self.VERDANA_FONT_8, (255, 68, 68))
+        self.ASSISTS_ROW = (
+            14,
+            self.VERDANA_FONT_9,
+            self.VERDANA_FONT_8,
+            (128, 248, 255),
+        )
+        # Level number text, font and position, measured once per level
+        self.level_labels: Dict[int, Tuple[str, ImageFont.FreeTypeFont, tuple]] = {}
+
+        # Cooldown overlay: ability row layout and sweep masks per icon size
+        self.cooldown_overlay = cooldown_overlay
+        self.cooldowns = CooldownTracker(cooldown_steps)
+        self.ABILITY_SIZE = 6
+        self.ABILITY_SLOTS = 6
+        self.ABILITY_ORIGIN = (0, 19)  # Along the bottom of the hero portrait
+        self.item_masks = get_sweep_masks(
+            (self.ITEM_SIZE, self.ITEM_SIZE), cooldown_steps
+        )
+        self.ability_masks = get_sweep_masks(
+            (self.ABILITY_SIZE, self.ABILITY_SIZE), cooldown_steps
+        )
+
     def load_font(self, path: str, size: int) -> ImageFont.FreeTypeFont:
         """Attempt to load a TrueType font, with a fallback to the default."""
         try:
@@ -50,6 +110,14 @@ class HUDRenderer:
             logging.warning(f"Could not load font '{path}'. Falling back to default.")
             return ImageFont.load_default()
 
+    def save_snapshot(self, path: str) -> None:
+        """Persist static layers and decoded icons so the next start is warm."""
+        save_cache_snapshot(path, self.static_layer_cache)
+
+    def load_snapshot(self, path: str) -> None:
+        """Warm the caches from a snapshot written by save_snapshot, if any."""
+        self.static_layer_cache.update(load_cache_snapshot(path))
+
     def draw_inventory_borders(self, draw: ImageDraw.Draw, origin: tuple) -> None:
         inv_x, inv_y = origin
         # Fill the inventory area with a dark gray background
@@ -128,7 +196,9 @@ class HUDRenderer:
 
         return canvas
 
-    def create_inventory_grid_image(self, items: dict) -> Image.Image:
+    def create_inventory_grid_image(
+        self, items: dict, cooldown_steps: Optional[Dict[str, int]] = None
+    ) -> Image.Image:
         img = Image.new("RGB", (self.GRID_W, self.GRID_H), (30, 30, 30))
         draw = ImageDraw.Draw(img)
 
@@ -155,10 +225,104 @@ class HUDRenderer:
                     x = col * self.SLOT_W
                     y = row * self.SLOT_H
                     img.paste(icon, (x, y))
+                    step = cooldown_steps.get(slot, 0) if cooldown_steps else 0
+                    if step:
+                        shade_cooldown(
+                            img,
+                            (x, y),
+                            (self.ITEM_SIZE, self.ITEM_SIZE),
+                            self.item_masks[step],
+                        )
                 except Exception as e:
                     logging.error(f"[!] Failed to load item {item_name}: {e}")
         return img
 
+    def cooldown_step(self, key: str, entry: dict) -> int:
+        if not self.cooldown_overlay:
+            return 0
+        return self.cooldowns.step(key, entry.get("name", ""), entry.get("cooldown", 0))
+
+    def inventory_changed(self, items: dict) -> bool:
+        """
+        Compare each slot's item and quantized cooldown against the last drawn
+        grid, so cooldowns ticking within a sweep step keep the cached grid.
+        """
+        changed = self.cached_inventory_image is None
+        for slot in self.slot_to_position:
+            item = items.get(slot, EMPTY_SLOT)
+            state = (item.get("name", ""), self.cooldown_step(slot, item))
+            if self.last_inventory.get(slot) != state:
+                self.last_inventory[slot] = state
+                changed = True
+        return changed
+
+    def ability_row(self, abilities: dict) -> List[Tuple[str, bool, int]]:
+        """(name, learned, cooldown step) for the abilities shown in the row."""
+        row = []
+        for key, ability in abilities.items():
+            name = ability.get("name", "")
+            if not name or name.startswith(HIDDEN_ABILITY_PREFIXES):
+                continue
+            row.append(
+                (name, ability.get("level", 0) > 0, self.cooldown_step(key, ability))
+            )
+            if len(row) == self.ABILITY_SLOTS:
+                break
+        return row
+
+    def create_ability_row_image(
+        self, row: List[Tuple[str, bool, int]]
+    ) -> Image.Image:
+        size = (self.ABILITY_SIZE, self.ABILITY_SIZE)
+        width = self.ABILITY_SLOTS * (self.ABILITY_SIZE + 1) - 1
+        img = Image.new("RGBA", (width, self.ABILITY_SIZE))
+        draw = ImageDraw.Draw(img)
+        for i, (name, learned, step) in enumerate(row):
+            x = i * (self.ABILITY_SIZE + 1)
+            try:
+                icon = get_ability_icon_cached(name, size)
+                # Unlearned abilities are dimmed
+                img.paste(icon if learned else brighten_image_cached(icon, 0.3), (x, 0))
+            except Exception as e:
+                logging.error(f"[!] Failed to load ability {name}: {e}")
+                draw.rectangle(
+                    [x, 0, x + self.ABILITY_SIZE - 1, self.ABILITY_SIZE - 1],
+                    fill=(60, 60, 60),
+                )
+            if step:
+                shade_cooldown(img, (x, 0), size, self.ability_masks[step])
+        return img
+
+    def level_label(
+        self, draw: ImageDraw.Draw, level: int
+    ) -> Tuple[str, ImageFont.FreeTypeFont, tuple]:
+        if level not in self.level_labels:
+            level_text = str(level)
+            font = self.CONSOLA_FONT_8 if level > 9 else self.CONSOLA_FONT_10
+            circle_x, circle_y, diameter = 47, 27, 10
+            bbox = draw.textbbox((0, 0), level_text, font=font)
+            tx = circle_x + (diameter - (bbox[2] - bbox[0])) // 2
+            ty = (
+                circle_y
+                + (diameter - (bbox[3] - bbox[1])) // 2
+                - (0 if level > 9 else 1)
+            )
+            self.level_labels[level] = (level_text, font, (tx, ty))
+        return self.level_labels[level]
+
+    def draw_bar(
+        self, draw: ImageDraw.Draw, x: int, y: int, w: int, val: float, color: tuple
+    ) -> None:
+        val = max(0.0, min(1.0, val))
+        if int(w * val) > 0:
+            draw.rectangle([x, y, x + int(w * val), y + 4], fill=color)
+
+    def draw_kda_value(self, draw: ImageDraw.Draw, val: int, row: tuple) -> None:
+        y, font9, font8, color = row
+        font = font8 if val > 9 else font9
+        x = 52 if val > 9 else 54
+        draw.text((x, y), str(val), font=font, fill=color)
+
     def create_base_layout(
         self,
         hero_name: str,
@@ -170,61 +334,52 @@ class HUDRenderer:
         deaths: int,
         assists: int,
         gold: int,
+        abilities: Optional[dict] = None,
     ) -> Image.Image:
-        # Use cached static layer if available
-        if hero_name in self.static_layer_cache:
-            static_layer = self.static_layer_cache[hero_name].copy()
-        else:
+        # Static layers are only ever pasted from, so the cache holds them as-is
+        static_layer = self.static_layer_cache.get(hero_name)
+        if static_layer is None:
             static_layer = self.create_static_layer(hero_name)
-            self.static_layer_cache[hero_name] = static_layer.copy()
+            self.static_layer_cache[hero_name] = static_layer
 
-        canvas = static_layer.copy()
-        draw = ImageDraw.Draw(canvas)
+        # Draw into the back buffer; the previous frame stays intact in the other
+        canvas = self.buffers[self.back_buffer]
+        draw = self.buffer_draws[self.back_buffer]
+        self.back_buffer ^= 1
+        canvas.paste(static_layer)
 
-        # Draw dynamic HP and Mana bars
-        def draw_bar(x: int, y: int, w: int, val: float, color: tuple) -> None:
-            val = max(0.0, min(1.0, val))
-            if int(w * val) > 0:
-                draw.rectangle([x, y, x + int(w * val), y + 4], fill=color)
+        # Ability row over the portrait, rebuilt only when a sweep advances a step
+        if self.cooldown_overlay:
+            row = self.ability_row(abilities or EMPTY_SLOT)
+            if row != self.last_abilities or self.cached_ability_row is None:
+                self.cached_ability_row = self.create_ability_row_image(row)
+                self.last_abilities = row
+            canvas.paste(
+                self.cached_ability_row, self.ABILITY_ORIGIN, self.cached_ability_row
+            )
 
-        draw_bar(0, 26, 40, hp, (0, 255, 0))
-        draw_bar(0, 32, 40, mana, (0, 100, 255))
+        # Draw dynamic HP and Mana bars
+        self.draw_bar(draw, 0, 26, 40, hp, (0, 255, 0))
+        self.draw_bar(draw, 0, 32, 40, mana, (0, 100, 255))
 
         # Render dynamic K/D/A numbers
-        for val, y, font9, font8, color in [
-            (kills, -2, self.VERDANA_FONT_9, self.VERDANA_FONT_8, (0, 255, 0)),
-            (deaths, 6, self.VERDANA_FONT_9, self.VERDANA_FONT_8, (255, 68, 68)),
-            (assists, 14, self.VERDANA_FONT_9, self.VERDANA_FONT_8, (128, 248, 255)),
-        ]:
-            text = str(val)
-            font = font8 if val > 9 else font9
-            x = 52 if val > 9 else 54
-            draw.text((x, y), text, font=font, fill=color)
+        self.draw_kda_value(draw, kills, self.KILLS_ROW)
+        self.draw_kda_value(draw, deaths, self.DEATHS_ROW)
+        self.draw_kda_value(draw, assists, self.ASSISTS_ROW)
 
         # Render the level number inside the level circle
-        level_text = str(level)
-        font = self.CONSOLA_FONT_8 if level > 9 else self.CONSOLA_FONT_10
-        circle_x, circle_y, diameter = 47, 27, 10
-        bbox = draw.textbbox((0, 0), level_text, font=font)
-        tx = circle_x + (diameter - (bbox[2] - bbox[0])) // 2
-        ty = circle_y + (diameter - (bbox[3] - bbox[1])) // 2 - (0 if level > 9 else 1)
-        draw.text((tx, ty), level_text, font=font, fill=(255, 204, 120))
-
-        # Inventory rendering: cache the grid if unchanged
-        inventory_data = {slot: items.get(slot, {}) for slot in self.slot_to_position}
-        inventory_key = json.dumps(inventory_data, sort_keys=True)
-        if (
-            inventory_key == self.last_inventory_key
-            and self.cached_inventory_image is not None
-        ):
-            inv_grid = self.cached_inventory_image
-        else:
-            inv_grid = self.create_inventory_grid_image(items)
-            self.last_inventory_key = inventory_key
-            self.cached_inventory_image = inv_grid.copy()
+        level_text, font, position = self.level_label(draw, level)
+        draw.text(position, level_text, font=font, fill=(255, 204, 120))
+
+        # Inventory rendering: cache the grid if unchanged, already in the
+        # canvas mode so pasting it doesn't convert a copy every frame
+        if self.inventory_changed(items):
+            self.cached_inventory_image = self.create_inventory_grid_image(
+                items, {slot: step for slot, (_, step) in self.last_inventory.items()}
+            ).convert(canvas.mode)
 
         # Paste the inventory grid
-        canvas.paste(inv_grid, self.GRID_ORIGIN)
+        canvas.paste(self.cached_inventory_image, self.GRID_ORIGIN)
 
         # Draw Gold Amount
         gold_text = str(gold)
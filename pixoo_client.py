@@ -0,0 +1,324 @@
+import base64
+import binascii
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+import requests
+from PIL import Image
+from color_calibration import ColorCalibration
+
+# Device limits for the Draw/SendHttpGif command
+PIXOO_SIZE = 64
+MAX_ANIMATION_FRAMES = 40  # the firmware drops uploads with more frames than this
+PIC_ID_REFRESH_LIMIT = 32  # the device slows down once PicIDs climb past this
+PIC_ID_WIDTH = 5  # digits reserved for the PicID inside a reused frame body
+
+
+class FrameIdAllocator:
+    """
+    Hand out PicIDs for Draw/SendHttpGif uploads.
+
+    Every upload (single frame or multi-frame animation) reserves its own ID, so
+    two animations that are built at the same time never write into each other's
+    frame slots. When the ID would pass `limit`, `on_reset` is called to clear the
+    device's GIF buffer and numbering starts again from 1. The device's own counter
+    is unknown at startup, so the first reservation always resets.
+    """
+
+    def __init__(self, on_reset: Callable[[], None], limit: int = PIC_ID_REFRESH_LIMIT):
+        self.on_reset = on_reset
+        self.limit = limit
+        self.counter = limit
+        self.lock = threading.Lock()
+
+    def reserve(self) -> int:
+        with self.lock:
+            if self.counter >= self.limit:
+                self.on_reset()
+                self.counter = 0
+            self.counter += 1
+            return self.counter
+
+
+class FrameEncoder:
+    """
+    Incrementally encode still frames into a reusable Draw/SendHttpGif body.
+
+    Each RGB row is `size * 3` bytes, a multiple of 3, so its base64 form is
+    independent of the neighbouring rows. The encoder keeps the last raw row
+    bytes and the JSON body in one preallocated buffer, and only re-encodes rows
+    whose pixels changed (or the `dirty_rows` the caller says it touched). The
+    PicID is written in place into a fixed-width, space-padded field at the end,
+    so a push sends the buffer itself without copying it.
+    """
+
+    def __init__(self, size: int = PIXOO_SIZE):
+        self.size = size
+        self.row_bytes = size * 3
+        self.row_chars = self.row_bytes // 3 * 4
+        self.rows: List[bytes] = [b""] * size
+
+        prefix = (
+            '{"Command":"Draw/SendHttpGif","PicNum":1,'
+            f'"PicWidth":{size},"PicOffset":0,"PicSpeed":1000,"PicData":"'
+        ).encode()
+        self.data_start = len(prefix)
+        self.data_end = self.data_start + size * self.row_chars
+        self.body = bytearray(
+            prefix
+            + b"A" * (size * self.row_chars)
+            + b'","PicID":'
+            + b" " * PIC_ID_WIDTH
+            + b"}"
+        )
+        self.pic_id_start = len(self.body) - 1 - PIC_ID_WIDTH
+
+    def update(self, img: Image.Image, dirty_rows: Optional[Iterable[int]] = None) -> int:
+        """
+        Refresh the cached encoding from `img`; returns the number of rows re-encoded.
+        """
+        if img.size != (self.size, self.size):
+            img = img.resize((self.size, self.size), Image.Resampling.NEAREST)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        # Pack straight to RGB without materializing a converted copy of the frame
+        raw = img.tobytes("raw", "RGB")
+
+        encoded = 0
+        for y in range(self.size) if dirty_rows is None else dirty_rows:
+            row = raw[y * self.row_bytes : (y + 1) * self.row_bytes]
+            if row == self.rows[y]:
+                continue
+            self.rows[y] = row
+            start = self.data_start + y * self.row_chars
+            self.body[start : start + self.row_chars] = binascii.b2a_base64(
+                row, newline=False
+            )
+            encoded += 1
+        return encoded
+
+    def pic_data(self) -> str:
+        return self.body[self.data_start : self.data_end].decode()
+
+    def frame_body(self, pic_id: int) -> bytearray:
+        """
+        The reused body with `pic_id` filled in; valid until the next update.
+        JSON allows whitespace before a number, so the ID is right-aligned.
+        """
+        if not 0 <= pic_id < 10**PIC_ID_WIDTH:
+            raise ValueError(f"PicID {pic_id} does not fit in {PIC_ID_WIDTH} digits")
+        self.body[self.pic_id_start : self.pic_id_start + PIC_ID_WIDTH] = b"%*d" % (
+            PIC_ID_WIDTH,
+            pic_id,
+        )
+        return self.body
+
+
+class PixooClient:
+    """
+    Minimal HTTP client for the Pixoo `/post` command API.
+
+    Keeps a single keep-alive session to the device and owns the PicID numbering,
+    so frames and animations pushed through it never collide. Every frame goes
+    through the panel's `calibration` just before encoding.
+
+    The device loops animations, so after one has played once its last frame is
+    put up as a still from a timer thread, unless another push came first.
+    """
+
+    def __init__(
+        self,
+        ip: str,
+        size: int = PIXOO_SIZE,
+        timeout: float = 5,
+        session: Optional[requests.Session] = None,
+        calibration: Optional[ColorCalibration] = None,
+    ):
+        self.ip = ip
+        self.url = f"http://{ip}/post"
+        self.size = size
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.frame_ids = FrameIdAllocator(self.reset_frame_ids)
+        self.encoder = FrameEncoder(size)
+        self.calibration = calibration or ColorCalibration()
+        # Serializes pushes from the caller and the still timer; each push bumps
+        # the generation so a late timer never overwrites a newer frame
+        self.push_lock = threading.RLock()
+        self.push_generation = 0
+        self.still_timer: Optional[threading.Timer] = None
+
+    def post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a single command to the device and return its JSON reply.
+        """
+        return self.post_body(json.dumps(payload).encode(), payload.get("Command"))
+
+    def post_body(
+        self, body: Union[bytes, bytearray], command: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Send an already serialized JSON command body.
+        """
+        response = self.session.post(
+            self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        data = response.json()
+        if data.get("error_code", 0) != 0:
+            logging.warning(f"[!] Pixoo rejected {command}: {data}")
+        return data
+
+    def get_channel(self) -> int:
+        return self.post({"Command": "Channel/GetIndex"}).get("SelectIndex", 0)
+
+    def set_channel(self, channel_index: int) -> None:
+        self.post({"Command": "Channel/SetIndex", "SelectIndex": channel_index})
+
+    def reset_frame_ids(self) -> None:
+        self.post({"Command": "Draw/ResetHttpGifId"})
+
+    def encode_frame(self, img: Image.Image) -> str:
+        """
+        Serialize an image into the base64 RGB string the device expects.
+        """
+        if img.size != (self.size, self.size):
+            img = img.resize((self.size, self.size), Image.Resampling.NEAREST)
+        return base64.b64encode(img.convert("RGB").tobytes()).decode()
+
+    def frame_command(
+        self, pic_id: int, pic_data: str, offset: int = 0, count: int = 1, speed: int = 1000
+    ) -> Dict[str, Any]:
+        return {
+            "Command": "Draw/SendHttpGif",
+            "PicNum": count,
+            "PicWidth": self.size,
+            "PicOffset": offset,
+            "PicID": pic_id,
+            "PicSpeed": speed,
+            "PicData": pic_data,
+        }
+
+    def push_frame(self, img: Image.Image, dirty_rows: Optional[Iterable[int]] = None) -> None:
+        """
+        Display a single still frame (one HTTP round trip), re-encoding only the
+        rows that changed since the previous frame.
+        """
+        with self.push_lock:
+            self.cancel_still()
+            self.encoder.update(self.calibration.apply(img), dirty_rows)
+            self.post_body(
+                self.encoder.frame_body(self.frame_ids.reserve()), "Draw/SendHttpGif"
+            )
+
+    def push_animation(self, frames: Sequence[Image.Image], speed: int = 100) -> None:
+        """
+        Upload a short animation in a single Draw/CommandList request, then show
+        its last frame as a still once it has played through, so it never loops.
+        Animations longer than the device accepts are replaced by their last frame.
+        """
+        if not frames:
+            return
+        if len(frames) > MAX_ANIMATION_FRAMES:
+            logging.warning(
+                f"[!] Animation of {len(frames)} frames exceeds {MAX_ANIMATION_FRAMES}; "
+                "showing its last frame instead"
+            )
+            self.push_frame(frames[-1])
+            return
+
+        with self.push_lock:
+            self.cancel_still()
+            pic_data: List[str] = [
+                self.encode_frame(self.calibration.apply(frame)) for frame in frames
+            ]
+            pic_id = self.frame_ids.reserve()
+            commands = [
+                self.frame_command(pic_id, data, offset, len(pic_data), speed)
+                for offset, data in enumerate(pic_data)
+            ]
+            self.post({"Command": "Draw/CommandList", "CommandList": commands})
+
+            generation = self.push_generation
+            self.still_timer = threading.Timer(
+                len(frames) * speed / 1000, self.push_still, (frames[-1], generation)
+            )
+            self.still_timer.daemon = True
+            self.still_timer.start()
+
+    def push_still(self, img: Image.Image, generation: int) -> None:
+        with self.push_lock:
+            if generation != self.push_generation:
+                return  # Something newer was pushed meanwhile
+            try:
+                self.push_frame(img)
+            except Exception as e:
+                logging.error(f"[!] Failed to show final animation frame: {e}")
+
+    def cancel_still(self) -> None:
+        """Drop the still scheduled by the last animation, if it has not run yet."""
+        with self.push_lock:
+            self.push_generation += 1
+            if self.still_timer is not None:
+                self.still_timer.cancel()
+                self.still_timer = None
+
+
+class ChannelSwitcher:
+    """
+    Apply channel changes on a background thread.
+
+    Requests only record the latest target, so a burst of state changes results
+    in a single Channel/SetIndex for whichever channel was asked for last, and
+    the caller never blocks on the device. Common channels:
+        0 = Faces (custom frames pushed over HTTP are shown here)
+        1 = Cloud Channel (Divoom App)
+        2 = Visualizer
+        3 = Custom (API-controlled)
+    """
+
+    def __init__(self, client: PixooClient, retry_delay: float = 1.0):
+        self.client = client
+        self.retry_delay = retry_delay
+        self.target: Optional[int] = None
+        self.current: Optional[int] = None
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(
+            target=self.run, name="pixoo-channel", daemon=True
+        )
+        self.thread.start()
+
+    def request(self, channel_index: int) -> None:
+        with self.cond:
+            self.target = channel_index
+            self.cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until the latest requested channel has been applied.
+        """
+        with self.cond:
+            return self.cond.wait_for(lambda: self.current == self.target, timeout)
+
+    def run(self) -> None:
+        while True:
+            with self.cond:
+                self.cond.wait_for(
+                    lambda: self.target is not None and self.target != self.current
+                )
+                channel_index = self.target
+            try:
+                self.client.set_channel(channel_index)
+            except Exception as e:
+                logging.error(f"[!] Failed to switch to Pixoo channel {channel_index}: {e}")
+                time.sleep(self.retry_delay)
+                continue
+            with self.cond:
+                self.current = channel_index
+                self.cond.notify_all()
+            logging.info(f"[✅] Switched to Pixoo channel {channel_index}")
@@ -0,0 +1,242 @@
+"""
+Virtual Pixoo 64 for load testing without hardware.
+
+Speaks the HTTP `/post` command protocol the HUD uses (Channel/GetIndex,
+Channel/SetIndex, Draw/GetHttpGifId, Draw/ResetHttpGifId, Draw/SendHttpGif and
+Draw/CommandList) with configurable latency, jitter and failure injection.
+Run several panels on one box and point each subscriber's PIXOO_IP at one:
+
+    python pixoo_emulator.py --count 4 --port 8001 --latency 0.08 --record out/
+"""
+
+import os
+import json
+import time
+import random
+import base64
+import logging
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional
+from PIL import Image
+
+logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+GIF_FRAMES = 600  # Most recent frames kept for the GIF; the PNGs keep every frame
+
+
+class EmulatedPixoo:
+    """
+    Device state for one emulated panel: channel, PicID counter, the animation
+    being uploaded, and counters for the frames it accepted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        size: int = 64,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        record_dir: Optional[str] = None,
+        gif_frames: int = GIF_FRAMES,
+    ):
+        self.name = name
+        self.size = size
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.record_dir = record_dir
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.channel = 1
+        self.pic_id = 0
+        self.pending: Dict[int, Image.Image] = {}
+        self.recorded: Deque[Image.Image] = deque(maxlen=gif_frames)
+        self.recorded_count = 0
+        self.accepted_frames = 0
+        self.requests = 0
+        self.failures = 0
+        self.started_at = time.monotonic()
+
+    def delay(self) -> None:
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def should_fail(self) -> bool:
+        return random.random() < self.failure_rate
+
+    def handle(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        name = command.get("Command")
+        if name == "Draw/CommandList":
+            for sub_command in command.get("CommandList", []):
+                reply = self.handle(sub_command)
+                if reply["error_code"] != 0:
+                    return reply
+            return {"error_code": 0}
+
+        with self.lock:
+            if name == "Channel/GetIndex":
+                return {"error_code": 0, "SelectIndex": self.channel}
+            if name == "Channel/SetIndex":
+                self.channel = int(command["SelectIndex"])
+                return {"error_code": 0}
+            if name == "Draw/GetHttpGifId":
+                return {"error_code": 0, "PicId": self.pic_id}
+            if name == "Draw/ResetHttpGifId":
+                self.pic_id = 0
+                self.pending.clear()
+                return {"error_code": 0}
+            if name == "Draw/SendHttpGif":
+                return self.receive_frame(command)
+        return {"error_code": 1, "error": f"Unknown command {name}"}
+
+    def receive_frame(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store one frame of an upload; the animation is shown (and counted) once
+        all PicNum frames for the PicID have arrived.
+        """
+        pic_id, offset, count = command["PicID"], command["PicOffset"], command["PicNum"]
+        data = base64.b64decode(command["PicData"])
+        if len(data) != self.size * self.size * 3 or not 0 <= offset < count:
+            return {"error_code": 1, "error": "Malformed frame"}
+        if pic_id != self.pic_id:
+            self.pic_id = pic_id
+            self.pending.clear()
+
+        self.pending[offset] = Image.frombytes("RGB", (self.size, self.size), data)
+        if len(self.pending) == count:
+            self.accepted_frames += count
+            self.record([self.pending[i] for i in range(count)])
+            self.pending.clear()
+        return {"error_code": 0}
+
+    def record(self, frames: List[Image.Image]) -> None:
+        if not self.record_dir:
+            return
+        for frame in frames:
+            path = os.path.join(
+                self.record_dir, f"{self.name}_{self.recorded_count:06d}.png"
+            )
+            frame.save(path)
+            self.recorded.append(frame)
+            self.recorded_count += 1
+
+    def save_gif(self, frame_ms: int = 1000) -> None:
+        """GIF of the most recent frames; long runs are only complete as PNGs."""
+        if not self.record_dir or not self.recorded:
+            return
+        path = os.path.join(self.record_dir, f"{self.name}.gif")
+        frames = list(self.recorded)
+        frames[0].save(
+            path,
+            save_all=True,
+            append_images=frames[1:],
+            duration=frame_ms,
+            loop=0,
+        )
+        logging.info(
+            f"[{self.name}] Recorded the last {len(frames)} of {self.recorded_count} "
+            f"frames to {path}"
+        )
+
+    def stats(self) -> str:
+        elapsed = time.monotonic() - self.started_at
+        return (
+            f"[{self.name}] {self.accepted_frames / elapsed:.1f} accepted frames/s since start, "
+            f"{self.requests} requests, {self.failures} injected failures, "
+            f"channel {self.channel}"
+        )
+
+
+def make_handler(device: EmulatedPixoo) -> type:
+    class PixooRequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            device.delay()
+            with device.lock:
+                device.requests += 1
+                if device.should_fail():
+                    device.failures += 1
+                    self.send_error(500, "Injected failure")
+                    return
+            if self.path != "/post":
+                self.send_error(404)
+                return
+            try:
+                reply = device.handle(json.loads(body))
+            except (ValueError, KeyError) as e:
+                reply = {"error_code": 1, "error": str(e)}
+
+            payload = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass  # one line per frame would drown the stats
+
+    return PixooRequestHandler
+
+
+def start_emulator(
+    host: str, port: int, device: EmulatedPixoo
+) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(device))
+    threading.Thread(
+        target=server.serve_forever, name=f"pixoo-emulator-{port}", daemon=True
+    ).start()
+    logging.info(f"[{device.name}] Emulated Pixoo listening on {host}:{port}")
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001, help="port of the first panel")
+    parser.add_argument("--count", type=int, default=1, help="number of panels")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds")
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0, help="fraction of requests failing"
+    )
+    parser.add_argument("--record", help="directory for recorded PNG frames and GIFs")
+    parser.add_argument(
+        "--gif-frames", type=int, default=GIF_FRAMES, help="most recent frames per GIF"
+    )
+    parser.add_argument(
+        "--stats-interval", type=float, default=10.0, help="seconds between reports"
+    )
+    args = parser.parse_args()
+
+    devices = []
+    for i in range(args.count):
+        device = EmulatedPixoo(
+            f"pixoo{i}",
+            latency=args.latency,
+            jitter=args.jitter,
+            failure_rate=args.failure_rate,
+            record_dir=args.record,
+            gif_frames=args.gif_frames,
+        )
+        start_emulator(args.host, args.port + i, device)
+        devices.append(device)
+
+    try:
+        while True:
+            time.sleep(args.stats_interval)
+            for device in devices:
+                logging.info(device.stats())
+    except KeyboardInterrupt:
+        for device in devices:
+            logging.info(device.stats())
+            device.save_gif()
+
+
+if __name__ == "__main__":
+    main()
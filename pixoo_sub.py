@@ -3,11 +3,44 @@ import logging
 import time
 import requests
 from datetime import timedelta
-from typing import Dict, Any
-from pixoo import Pixoo
+from typing import Dict, Any, Optional, Tuple
+from PIL import Image
+from pixoo_client import PixooClient, ChannelSwitcher
+from color_calibration import CalibrationFile
 from hud_renderer import HUDRenderer
-from dota_game_states import GameState
-from config import PIXOO_IP, ZMQ_SUBSCRIBE_ADDR, ZMQ_SUBSCRIBE_TOPIC, GSI_TIMEOUT
+from scoreboard_renderer import ScoreboardRenderer
+from hud_animations import flash_frames, crossfade_frames
+from dota_game_states import GameStateMachine, state_signature
+from gsi_codec import GSICodec, wire_topic
+from config import (
+    PIXOO_IP,
+    PIXOO_CALIBRATIONS,
+    PIXOO_CALIBRATION_FILE,
+    ZMQ_SUBSCRIBE_ADDR,
+    ZMQ_STATE_TOPIC,
+    ZMQ_SUBSCRIBE_CODEC,
+    ZMQ_SUBSCRIBE_SOURCE,
+    GSI_TIMEOUT,
+    GSI_IDLE_TIMEOUT,
+    LOW_POWER_IDLE,
+    DAEMON_MODE,
+    HUD_SNAPSHOT_PATH,
+    HUD_LAYOUT,
+    LAYOUT_TOPICS,
+    SCOREBOARD_PAGE_SIZE,
+    SCOREBOARD_PAGE,
+    SCOREBOARD_FRAME_BUDGET,
+    TARGET_FPS,
+    ANIMATION_FRAME_MS,
+    HP_EASING_THRESHOLD,
+    COOLDOWN_OVERLAY,
+    COOLDOWN_SWEEP_STEPS,
+    GAME_STATE_LEAVE_CONFIRMATIONS,
+    GAME_STATE_MIN_DWELL,
+)
+
+# Set up logging format
+logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 
 
 def get_pixoo_channel(ip: str) -> int:
@@ -27,42 +60,6 @@ def get_pixoo_channel(ip: str) -> int:
         return 0
 
 
-def switch_to_divoom_channel(ip: str, channel_index: int = 1):
-    """
-    Switch Pixoo display to a built-in channel.
-    Common channels:
-        0 = Faces
-        1 = Cloud Channel (Divoom App)
-        2 = Visualizer
-        3 = Custom (API-controlled)
-    """
-    try:
-        payload = {"Command": "Channel/SetIndex", "SelectIndex": channel_index}
-        response = requests.post(f"http://{ip}/post", json=payload, timeout=5)
-        response.raise_for_status()
-        print(f"[✅] Switched to Pixoo channel {channel_index}")
-    except Exception as e:
-        print(f"[!] Failed to switch channel: {e}")
-
-
-original_channel = get_pixoo_channel(PIXOO_IP)
-print(f"Original Pixoo channel: {original_channel}")
-
-
-# Set up logging format
-logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
-
-# Initialize Pixoo display using its IP address
-pixoo = Pixoo(PIXOO_IP)
-
-# Set up ZeroMQ subscriber socket to receive GSI updates
-context = zmq.Context()
-socket = context.socket(zmq.SUB)
-socket.connect(ZMQ_SUBSCRIBE_ADDR)
-socket.setsockopt_string(zmq.SUBSCRIBE, ZMQ_SUBSCRIBE_TOPIC)
-socket.RCVTIMEO = GSI_TIMEOUT  # Set socket receive timeout (5 seconds)
-
-
 def format_hero_name(raw_name: str) -> str:
     """
     Convert raw hero ID from Dota (e.g., 'npc_dota_hero_juggernaut') into readable format ('Juggernaut').
@@ -127,72 +124,274 @@ def get_game_details(data: Dict[str, Any]) -> Dict[str, Any]:
         "assists": assists,
         "time_str": time_str,
         "items": filtered_items,
+        "abilities": data.get("abilities", {}),
         "gold": gold,
     }
 
 
-def main() -> None:
-    logging.info("🟢 Pixoo Dota 2 HUD listener started.")
-    hud_renderer = HUDRenderer()
-    prev_game_state = None
-    last_update_time = time.time()
-
-    while True:
-        try:
-            data = socket.recv_json()
-            last_update_time = time.time()  # Record last successful message
-
-            # Parse game state
-            map_data = data.get("map", {})
-            raw_game_state = map_data.get("game_state", "UNKNOWN")
-            game_state = (
-                GameState(raw_game_state)
-                if raw_game_state in GameState._value2member_map_
-                else GameState.UNKNOWN
+class HUDSubscriber:
+    """
+    Receives GSI updates from ZeroMQ, renders the HUD and pushes it to the Pixoo.
+
+    While idle (outside a match, hero dead, or game paused) rendering stops and,
+    with `low_power_idle`, the socket drops the full HUD topic and only listens
+    on the state topic, blocking until a state-relevant field changes.
+
+    When no data arrives at all, a `daemon` restores the original channel and
+    parks on the state topic with no timeout, keeping its caches warm for the
+    next match instead of exiting.
+
+    `layout` picks the renderer: "hero" for the player's own HUD or
+    "scoreboard" for all ten players while spectating.
+    """
+
+    def __init__(
+        self,
+        socket: zmq.Socket,
+        pixoo: PixooClient,
+        channel_switcher: ChannelSwitcher,
+        original_channel: int,
+        low_power_idle: bool = LOW_POWER_IDLE,
+        codec: Optional[GSICodec] = None,
+        daemon: bool = DAEMON_MODE,
+        layout: str = HUD_LAYOUT,
+    ):
+        self.socket = socket
+        self.pixoo = pixoo
+        self.channel_switcher = channel_switcher
+        self.original_channel = original_channel
+        self.low_power_idle = low_power_idle
+        self.daemon = daemon
+        self.layout = layout
+        self.codec = codec or GSICodec(ZMQ_SUBSCRIBE_CODEC)
+        self.hud_topic = wire_topic(
+            LAYOUT_TOPICS[layout], self.codec.name, ZMQ_SUBSCRIBE_SOURCE
+        )
+        self.state_topic = wire_topic(
+            ZMQ_STATE_TOPIC, self.codec.name, ZMQ_SUBSCRIBE_SOURCE
+        )
+
+        if layout == "scoreboard":
+            self.hud_renderer = ScoreboardRenderer(
+                SCOREBOARD_PAGE_SIZE,
+                SCOREBOARD_PAGE,
+                budget=SCOREBOARD_FRAME_BUDGET / TARGET_FPS,
             )
+        else:
+            self.hud_renderer = HUDRenderer(COOLDOWN_OVERLAY, COOLDOWN_SWEEP_STEPS)
+        view = f"scoreboard_p{SCOREBOARD_PAGE}" if layout == "scoreboard" else layout
+        self.snapshot_path = HUD_SNAPSHOT_PATH and HUD_SNAPSHOT_PATH.format(view=view)
+        self.calibrations = CalibrationFile(PIXOO_CALIBRATION_FILE, PIXOO_CALIBRATIONS)
+        self.state_machine = GameStateMachine(
+            GAME_STATE_LEAVE_CONFIRMATIONS, GAME_STATE_MIN_DWELL
+        )
+        self.prev_img: Optional[Image.Image] = None
+        self.prev_details: Optional[Dict[str, Any]] = None
+        self.idle = False
+        self.idle_signature: Optional[Tuple[str, bool, bool]] = None
+        self.last_update_time = time.time()
+        self.match_started_at: Optional[float] = None
 
-            # Check if game state has changed
-            if game_state != prev_game_state:
-                logging.info(
-                    f"[📺] Game state changed: {prev_game_state} ➜ {game_state}"
-                )
-                prev_game_state = game_state
-
-                if game_state in [GameState.PRE_GAME, GameState.GAME_IN_PROGRESS]:
-                    logging.info("[🏁] Match has started!")
-                    pixoo.set_channel(0)
-                elif game_state in [GameState.POST_GAME, GameState.UNKNOWN]:
-                    logging.info("[✅] Match has ended or state unknown.")
-                    switch_to_divoom_channel(PIXOO_IP, original_channel)
-
-            # Update HUD if actively in-game
-            if game_state in [GameState.PRE_GAME, GameState.GAME_IN_PROGRESS]:
-                details = get_game_details(data)
-                img = hud_renderer.create_base_layout(
-                    hero_name=details["hero_id"],
-                    level=details["level"],
-                    hp=details["hp_ratio"],
-                    mana=details["mana_ratio"],
-                    items=details["items"],
-                    kills=details["kills"],
-                    deaths=details["deaths"],
-                    assists=details["assists"],
-                    gold=details["gold"],
-                )
-                pixoo.draw_image(img)
-                pixoo.push()
-
-        except zmq.error.Again:
-            # Timeout occurred — check how long it's been since last GSI update
-            if time.time() - last_update_time > GSI_TIMEOUT / 1000:
-                logging.warning(
-                    f"⏱️ No data received in {GSI_TIMEOUT / 1000}s. Assuming Dota 2 was closed."
+        self.socket.setsockopt_string(zmq.SUBSCRIBE, self.hud_topic)
+        self.socket.RCVTIMEO = GSI_TIMEOUT
+
+    def enter_idle(
+        self,
+        signature: Optional[Tuple[str, bool, bool]],
+        timeout: int = GSI_IDLE_TIMEOUT,
+    ) -> None:
+        """
+        Listen on the state topic only, waking when the state differs from
+        `signature` (None wakes on any state message).
+        """
+        if not self.idle:
+            logging.info("[💤] Idle — waiting for a state change.")
+            self.socket.setsockopt_string(zmq.UNSUBSCRIBE, self.hud_topic)
+            self.socket.setsockopt_string(zmq.SUBSCRIBE, self.state_topic)
+            self.idle = True
+        self.socket.RCVTIMEO = timeout
+        self.idle_signature = signature
+
+    def leave_idle(self) -> None:
+        logging.info("[⏰] State changed — resuming HUD updates.")
+        self.socket.setsockopt_string(zmq.UNSUBSCRIBE, self.state_topic)
+        self.socket.setsockopt_string(zmq.SUBSCRIBE, self.hud_topic)
+        self.socket.RCVTIMEO = GSI_TIMEOUT
+        self.idle = False
+        self.idle_signature = None
+
+    def park(self) -> None:
+        """
+        Dota 2 is gone: hand the panel back and block until GSI data returns.
+        """
+        logging.info("[🅿️] Parked — waiting for the next match.")
+        self.pixoo.cancel_still()
+        self.channel_switcher.request(self.original_channel)
+        self.state_machine = GameStateMachine(
+            GAME_STATE_LEAVE_CONFIRMATIONS, GAME_STATE_MIN_DWELL
+        )
+        self.reset_frames()
+        self.enter_idle(None, timeout=-1)
+
+    def reset_frames(self) -> None:
+        """
+        The panel may have shown another channel since the last push, so make
+        the next frame a full one instead of a transition or a row update.
+        """
+        self.prev_img, self.prev_details = None, None
+        if self.layout == "scoreboard":
+            self.hud_renderer.reset()
+
+    def shutdown(self) -> None:
+        self.pixoo.cancel_still()
+        self.channel_switcher.request(self.original_channel)
+        self.channel_switcher.flush()
+        if self.snapshot_path:
+            self.hud_renderer.save_snapshot(self.snapshot_path)
+
+    def push_hud_frame(self, img: Image.Image, details: Dict[str, Any]) -> None:
+        """
+        Push the new HUD frame, uploading a short transition in one request when
+        something worth highlighting changed since the previous frame.
+        """
+        prev_img, prev_details = self.prev_img, self.prev_details
+
+        if prev_img is None or prev_details is None:
+            self.pixoo.push_frame(img)
+        elif details["kills"] > prev_details["kills"]:
+            self.pixoo.push_animation(
+                flash_frames(img, (255, 215, 0)), ANIMATION_FRAME_MS
+            )
+        elif details["level"] > prev_details["level"]:
+            self.pixoo.push_animation(
+                flash_frames(img, (255, 255, 255)), ANIMATION_FRAME_MS
+            )
+        elif (
+            abs(details["hp_ratio"] - prev_details["hp_ratio"])
+            >= HP_EASING_THRESHOLD
+        ):
+            self.pixoo.push_animation(
+                crossfade_frames(prev_img, img), ANIMATION_FRAME_MS
+            )
+        else:
+            self.pixoo.push_frame(img)
+
+    def handle_message(self, topic: str, data: Dict[str, Any]) -> None:
+        self.last_update_time = time.time()  # Record last successful message
+        signature = state_signature(data)
+
+        if topic == ZMQ_STATE_TOPIC:
+            # Only reachable while idle; wake up on anything but a heartbeat
+            if self.idle and signature != self.idle_signature:
+                self.leave_idle()
+            return
+
+        # Debounce the game state; only committed transitions touch the device
+        prev_game_state = self.state_machine.state
+        game_state = self.state_machine.update(signature[0])
+        if game_state is not None:
+            logging.info(f"[📺] Game state changed: {prev_game_state} ➜ {game_state}")
+            self.reset_frames()
+
+            if self.state_machine.is_active:
+                logging.info("[🏁] Match has started!")
+                self.channel_switcher.request(0)
+                self.match_started_at = time.perf_counter()
+            else:
+                logging.info("[✅] Match has ended or state unknown.")
+                self.pixoo.cancel_still()
+                self.channel_switcher.request(self.original_channel)
+
+        # Outside a match nothing is drawn; while dead or paused the last frame stays
+        _, paused, alive = signature
+        if self.state_machine.is_idle or paused or not alive:
+            # Stay on the full topic while a state change is still being confirmed
+            if self.low_power_idle and self.state_machine.candidate is None:
+                self.enter_idle(signature)
+            if self.state_machine.is_idle or self.low_power_idle:
+                return
+
+        calibration = self.calibrations.get(self.pixoo.ip)
+        recalibrated = calibration is not self.pixoo.calibration
+        self.pixoo.calibration = calibration
+
+        if self.layout == "scoreboard":
+            img, dirty_rows = self.hud_renderer.render(data)
+            # A new calibration changes every row, not just the redrawn ones
+            if recalibrated:
+                dirty_rows = None
+            if dirty_rows != []:
+                self.pixoo.push_frame(img, dirty_rows)
+        else:
+            details = get_game_details(data)
+            img = self.hud_renderer.create_base_layout(
+                hero_name=details["hero_id"],
+                level=details["level"],
+                hp=details["hp_ratio"],
+                mana=details["mana_ratio"],
+                items=details["items"],
+                kills=details["kills"],
+                deaths=details["deaths"],
+                assists=details["assists"],
+                gold=details["gold"],
+                abilities=details["abilities"],
+            )
+            self.push_hud_frame(img, details)
+            # The renderer double-buffers, so img stays intact while the next frame is drawn
+            self.prev_img, self.prev_details = img, details
+
+        if self.match_started_at is not None:
+            elapsed = time.perf_counter() - self.match_started_at
+            logging.info(f"[⚡] First HUD frame {elapsed * 1000:.0f} ms after match start")
+            self.match_started_at = None
+
+    def run(self) -> None:
+        logging.info("🟢 Pixoo Dota 2 HUD listener started.")
+        if self.snapshot_path:
+            self.hud_renderer.load_snapshot(self.snapshot_path)
+
+        while True:
+            try:
+                self.handle_message(
+                    *self.codec.decode_message(self.socket.recv_multipart())
                 )
-                switch_to_divoom_channel(PIXOO_IP, original_channel)
-                logging.warning(f"Closing Script. Goodbye! 👋")
-                exit()
-        except Exception as e:
-            logging.exception("[!] Unexpected error while updating Pixoo display")
+
+            except zmq.error.Again:
+                # Timeout occurred — check how long it's been since last GSI update
+                timeout = self.socket.RCVTIMEO
+                if time.time() - self.last_update_time > timeout / 1000:
+                    logging.warning(
+                        f"⏱️ No data received in {timeout / 1000}s. Assuming Dota 2 was closed."
+                    )
+                    if self.daemon:
+                        self.park()
+                        continue
+                    self.shutdown()
+                    logging.warning("Closing Script. Goodbye! 👋")
+                    exit()
+            except KeyboardInterrupt:
+                self.shutdown()
+                logging.warning("Closing Script. Goodbye! 👋")
+                return
+            except Exception as e:
+                logging.exception("[!] Unexpected error while updating Pixoo display")
+
+
+def main() -> None:
+    original_channel = get_pixoo_channel(PIXOO_IP)
+    print(f"Original Pixoo channel: {original_channel}")
+
+    # Initialize Pixoo display using its IP address; channel changes go through
+    # their own connection so they never wait behind a frame upload
+    pixoo = PixooClient(PIXOO_IP)
+    channel_switcher = ChannelSwitcher(PixooClient(PIXOO_IP))
+
+    # Set up ZeroMQ subscriber socket to receive GSI updates
+    context = zmq.Context()
+    socket = context.socket(zmq.SUB)
+    socket.connect(ZMQ_SUBSCRIBE_ADDR)
+
+    HUDSubscriber(socket, pixoo, channel_switcher, original_channel).run()
 
 
 if __name__ == "__main__":
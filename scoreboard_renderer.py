@@ -0,0 +1,229 @@
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from PIL import Image, ImageDraw
+from dota_2_cdn import (
+    get_hero_thumbnails_cached,
+    brighten_image_cached,
+    save_cache_snapshot,
+    load_cache_snapshot,
+)
+
+# Player slots in spectator (allplayers) payloads: Radiant is team2, Dire team3
+PLAYER_SLOTS = tuple(
+    ("team2" if i < 5 else "team3", f"player{i}") for i in range(10)
+)
+TEAM_COLORS = {"team2": (140, 230, 140), "team3": (240, 120, 120)}
+NET_WORTH_COLOR = (245, 200, 0)
+TEAM_GAP = 4  # Pixel rows between Radiant and Dire when a page shows both
+PORTRAIT_RETRY_INTERVAL = 5.0  # Seconds between lookups of portraits that failed
+
+# 3x5 pixel glyphs; TrueType fonts are unreadable at scoreboard row heights
+GLYPH_HEIGHT = 5
+GLYPH_ROWS = {
+    "0": ("111", "101", "101", "101", "111"),
+    "1": ("010", "110", "010", "010", "111"),
+    "2": ("111", "001", "111", "100", "111"),
+    "3": ("111", "001", "111", "001", "111"),
+    "4": ("101", "101", "111", "001", "001"),
+    "5": ("111", "100", "111", "001", "111"),
+    "6": ("111", "100", "111", "101", "111"),
+    "7": ("111", "001", "010", "010", "010"),
+    "8": ("111", "101", "111", "101", "111"),
+    "9": ("111", "101", "111", "001", "111"),
+    "/": ("001", "001", "010", "100", "100"),
+    "-": ("000", "000", "111", "000", "000"),
+    "k": ("100", "101", "110", "101", "101"),
+    ".": ("0", "0", "0", "0", "1"),
+}
+
+
+def make_glyph(rows: Tuple[str, ...]) -> Image.Image:
+    glyph = Image.new("1", (len(rows[0]), GLYPH_HEIGHT))
+    glyph.putdata([int(bit) for row in rows for bit in row])
+    return glyph
+
+
+GLYPHS = {char: make_glyph(rows) for char, rows in GLYPH_ROWS.items()}
+
+
+def format_net_worth(net_worth: int) -> str:
+    """Fit net worth into at most four glyphs: 850, 9.8k, 23k."""
+    if net_worth < 1000:
+        return str(net_worth)
+    if net_worth < 10000:
+        return f"{net_worth // 100 / 10:.1f}k"
+    return f"{net_worth // 1000}k"
+
+
+def player_row(data: Dict[str, Any], team: str, slot: str) -> Optional[Tuple]:
+    """
+    (hero name, kills, deaths, assists, net worth, alive) for one player, or
+    None when the payload has no such player (not spectating, empty slot).
+    """
+    player = data.get("player", {}).get(team, {}).get(slot)
+    if not isinstance(player, dict):
+        return None
+    hero = data.get("hero", {}).get(team, {}).get(slot, {})
+    return (
+        hero.get("name", "npc_dota_hero_unknown"),
+        player.get("kills", 0),
+        player.get("deaths", 0),
+        player.get("assists", 0),
+        player.get("net_worth", 0),
+        hero.get("alive", True),
+    )
+
+
+class ScoreboardRenderer:
+    """
+    Spectator scoreboard: one row per player with portrait, K/D/A and net worth,
+    Radiant above Dire. With fewer `players_per_page` the scoreboard is paged
+    across several panels (run one subscriber per panel with its own `page`),
+    and the taller rows put net worth on a second line.
+
+    Only rows whose player changed are redrawn, and `render` reports the pixel
+    rows it touched so the frame encoder skips the rest. Once `budget` seconds
+    of a frame are spent, remaining rows are left for the next update.
+    """
+
+    # GSI providers this layout reads (see create_dota_2_gsi_config.py)
+    GSI_PROVIDERS = ("map", "player", "hero", "allplayers", "draft")
+
+    def __init__(
+        self,
+        players_per_page: int = 10,
+        page: int = 0,
+        budget: Optional[float] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.slots = PLAYER_SLOTS[page * players_per_page : (page + 1) * players_per_page]
+        if not self.slots:
+            raise ValueError(
+                f"Page {page} is empty with {players_per_page} players per page"
+            )
+        self.budget = budget
+        self.clock = clock
+
+        # Row layout, with a gap between the teams if this page shows both
+        gap = TEAM_GAP if len({team for team, _ in self.slots}) > 1 else 0
+        self.row_height = (64 - gap) // len(self.slots)
+        self.row_origins: List[int] = []
+        divider_y = None
+        y = 0
+        for i, (team, _) in enumerate(self.slots):
+            if i and team != self.slots[i - 1][0]:
+                divider_y = y + gap // 2 - 1
+                y += gap
+            self.row_origins.append(y)
+            y += self.row_height
+        portrait_height = self.row_height - 1
+        self.portrait_size = (round(portrait_height * 16 / 9), portrait_height)
+        self.text_x = self.portrait_size[0] + 2
+        self.two_lines = portrait_height >= 2 * GLYPH_HEIGHT + 1
+
+        # One persistent canvas; rows are redrawn in place
+        self.canvas = Image.new("RGBA", (64, 64), (0, 0, 0, 255))
+        self.draw = ImageDraw.Draw(self.canvas)
+        if divider_y is not None:
+            self.draw.line([(0, divider_y), (63, divider_y)], fill=(60, 60, 60))
+
+        self.drawn: List[Optional[Tuple]] = [None] * len(self.slots)
+        self.heroes: Tuple[str, ...] = ()
+        self.portraits: List[Image.Image] = []
+        self.failed_portraits: Set[str] = set()
+        self.portraits_looked_up = 0.0
+        self.next_row = 0  # Where a frame that ran out of budget resumes
+        self.first_frame = True
+
+    def save_snapshot(self, path: str) -> None:
+        """Persist decoded portraits so the next start is warm."""
+        save_cache_snapshot(path, {})
+
+    def load_snapshot(self, path: str) -> None:
+        load_cache_snapshot(path)
+
+    def reset(self) -> None:
+        """Report the next frame as a full one; the canvas itself is still current."""
+        self.first_frame = True
+
+    def text_width(self, text: str) -> int:
+        return sum(GLYPHS[char].width + 1 for char in text) - 1
+
+    def draw_text(self, text: str, x: int, y: int, color: tuple) -> None:
+        for char in text:
+            glyph = GLYPHS[char]
+            self.draw.bitmap((x, y), glyph, fill=color)
+            x += glyph.width + 1
+
+    def draw_row(self, index: int, row: Optional[Tuple]) -> None:
+        y = self.row_origins[index]
+        self.draw.rectangle([0, y, 63, y + self.row_height - 1], fill=(0, 0, 0))
+        if row is None:
+            return
+        _, kills, deaths, assists, net_worth, alive = row
+        portrait = self.portraits[index]
+        if not alive:
+            portrait = brighten_image_cached(portrait, 0.35)
+        self.canvas.paste(portrait, (0, y))
+
+        team = self.slots[index][0]
+        net_worth_text = format_net_worth(net_worth)
+        if self.two_lines:
+            kda_y, net_worth_y = y, y + GLYPH_HEIGHT + 1
+        else:
+            kda_y = net_worth_y = y + (self.row_height - 1 - GLYPH_HEIGHT) // 2
+        self.draw_text(f"{kills}/{deaths}/{assists}", self.text_x, kda_y, TEAM_COLORS[team])
+        self.draw_text(
+            net_worth_text, 64 - self.text_width(net_worth_text), net_worth_y, NET_WORTH_COLOR
+        )
+
+    def render(self, data: Dict[str, Any]) -> Tuple[Image.Image, Optional[List[int]]]:
+        """
+        Update the scoreboard from a GSI payload. Returns the canvas and the
+        pixel rows redrawn (None on the first frame, meaning all of them).
+        """
+        started = self.clock()
+        rows = [player_row(data, team, slot) for team, slot in self.slots]
+
+        # All portraits in one batched lookup, and only when a hero changed or
+        # a portrait that failed to load is due for another try
+        heroes = tuple(row[0] if row else "" for row in rows)
+        if heroes != self.heroes or (
+            self.failed_portraits
+            and started - self.portraits_looked_up >= PORTRAIT_RETRY_INTERVAL
+        ):
+            portraits, self.failed_portraits = get_hero_thumbnails_cached(
+                heroes, self.portrait_size
+            )
+            self.portraits_looked_up = started
+            # Rows whose portrait arrived are redrawn even if nothing else changed
+            for index, (old, new) in enumerate(zip(self.portraits, portraits)):
+                if old is not new:
+                    self.drawn[index] = None
+            self.portraits = portraits
+            self.heroes = heroes
+
+        dirty_rows: List[int] = []
+        for n in range(len(rows)):
+            index = (self.next_row + n) % len(rows)
+            if rows[index] == self.drawn[index]:
+                continue
+            # Always draw at least one row, so a slow frame still makes progress
+            if (
+                self.budget is not None
+                and dirty_rows
+                and self.clock() - started > self.budget
+            ):
+                self.next_row = index
+                logging.debug(f"Scoreboard frame over budget; resuming at row {index}")
+                break
+            self.draw_row(index, rows[index])
+            self.drawn[index] = rows[index]
+            y = self.row_origins[index]
+            dirty_rows.extend(range(y, y + self.row_height))
+
+        if self.first_frame:
+            self.first_frame = False
+            return self.canvas, None
+        return self.canvas, dirty_rows
@@ -0,0 +1,12 @@
+from benchmark import RENDER_ALLOCATION_BUDGET, measure_render_allocations
+
+
+def test_steady_state_frame_stays_within_allocation_budget():
+    worst, created = measure_render_allocations()
+    assert created == 0, (
+        f"Steady-state HUD frames created {created} images/draw contexts"
+    )
+    assert worst <= RENDER_ALLOCATION_BUDGET, (
+        f"Steady-state HUD frame allocated {worst} B of Python heap, "
+        f"budget is {RENDER_ALLOCATION_BUDGET} B"
+    )